@@ -0,0 +1,38 @@
+from api.snapshots import Snapshots
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Сборка статических снимков каталога для nginx'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=settings.SNAPSHOT_PAGES,
+            help='Количество первых страниц каждого списка произведений'
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='После сборки обновлять снимки по журналу изменений'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.SNAPSHOT_REFRESH_INTERVAL,
+            help='Пауза между опросами журнала изменений, секунд'
+        )
+
+    def handle(self, *args, **kwargs):
+        if not settings.SNAPSHOT_HOST:
+            raise CommandError(
+                'Задайте SNAPSHOT_HOST: хост для ссылок пагинации в снимках'
+            )
+        snapshots = Snapshots(kwargs['pages'])
+        if kwargs['watch']:
+            snapshots.watch(kwargs['interval'])
+            return
+        written = snapshots.build_all()
+        self.stdout.write(f'snapshots: записано {written}')
@@ -0,0 +1,51 @@
+"""Middleware админки, которые не нужны запросам к API.
+
+API аутентифицирует только по JWT: сессия, CSRF-кука, request.user из
+сессии и сообщения ему не нужны, но стандартные middleware обрабатывают
+каждый запрос. Подклассы ниже пропускают запросы с путём, начинающимся
+с API_PATH_PREFIX, и работают как обычно для админки и остальных
+страниц. Это подклассы стандартных классов, поэтому системные проверки
+админки (admin.E408–E410) их находят.
+"""
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import csrf
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SkipForAPIMixin:
+    """Запросы к API идут сразу к следующему middleware."""
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipForAPIMixin, sessions.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SkipForAPIMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args,
+                     callback_kwargs):
+        # process_view вызывается обработчиком Django отдельно от __call__.
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args,
+                                    callback_kwargs)
+
+
+class AuthenticationMiddleware(SkipForAPIMixin,
+                               auth.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SkipForAPIMixin, messages.MessageMiddleware):
+    pass
@@ -0,0 +1,164 @@
+"""Профилирование отдельных запросов к API по требованию администратора.
+
+Запрос к api/v1 с заголовком X-Profile или параметром ?profile
+от администратора выполняется под cProfile, а каждый SQL-запрос
+записывается с длительностью и местом вызова в коде проекта. Отчёт
+сохраняется в PROFILE_REPORTS_DIR, его id возвращается в заголовке
+X-Profile-Id. В каталоге остаются PROFILE_REPORTS_LIMIT последних
+отчётов. Без триггера middleware ничего не делает.
+"""
+import json
+import os
+import time
+import traceback
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+PROFILED_PREFIX = '/api/v1/'
+
+
+def report_path(report_id, extension):
+    return os.path.join(settings.PROFILE_REPORTS_DIR,
+                        f'{report_id}.{extension}')
+
+
+def remove_old_reports():
+    """Удаление отчётов сверх PROFILE_REPORTS_LIMIT, начиная со старых."""
+    with os.scandir(settings.PROFILE_REPORTS_DIR) as entries:
+        reports = sorted(
+            (entry.stat().st_mtime, entry.name[:-len('.json')])
+            for entry in entries if entry.name.endswith('.json')
+        )
+    for _, report_id in reports[:-max(settings.PROFILE_REPORTS_LIMIT, 1)]:
+        for extension in ('json', 'prof'):
+            try:
+                os.remove(report_path(report_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+class QueryRecorder:
+    """Обёртка execute, записывающая SQL, время и место вызова."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+                'origin': self.origin(),
+            })
+
+    @staticmethod
+    def origin():
+        """Ближайший к запросу кадр стека из кода проекта."""
+        for frame in reversed(traceback.extract_stack()[:-2]):
+            if (frame.filename.startswith(settings.BASE_DIR)
+                    and frame.filename != __file__):
+                return f'{frame.filename}:{frame.lineno} in {frame.name}'
+        return None
+
+    def summary(self):
+        """Сводка: всего запросов и времени, повторы одинакового SQL."""
+        groups = defaultdict(lambda: {'count': 0, 'duration_ms': 0,
+                                      'origins': set()})
+        for query in self.queries:
+            group = groups[query['sql']]
+            group['count'] += 1
+            group['duration_ms'] += query['duration_ms']
+            group['origins'].add(query['origin'])
+        statements = sorted(
+            ({'sql': sql, 'count': group['count'],
+              'duration_ms': round(group['duration_ms'], 3),
+              'origins': sorted(filter(None, group['origins']))}
+             for sql, group in groups.items()),
+            key=lambda item: item['duration_ms'],
+            reverse=True
+        )
+        return {
+            'query_count': len(self.queries),
+            'query_time_ms': round(
+                sum(query['duration_ms'] for query in self.queries), 3
+            ),
+            'statements': statements,
+            'queries': self.queries,
+        }
+
+
+class ProfilingMiddleware:
+    """Профилирование запроса к API, если его запросил администратор."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_requested(request):
+            return self.get_response(request)
+        if not self.is_admin(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    @staticmethod
+    def is_requested(request):
+        return request.path.startswith(PROFILED_PREFIX) and (
+            PROFILE_HEADER in request.META or PROFILE_PARAM in request.GET
+        )
+
+    @staticmethod
+    def is_admin(request):
+        # Импорты внутри: middleware грузится в каждом воркере, а JWT
+        # и cProfile нужны только для запросов с триггером.
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                user_auth = JWTAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            if user_auth is None:
+                return False
+            user = user_auth[0]
+        return user.is_admin
+
+    def profile(self, request):
+        import cProfile
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with connections['default'].execute_wrapper(recorder):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = (time.perf_counter() - started) * 1000
+        report_id = uuid.uuid4().hex
+        os.makedirs(settings.PROFILE_REPORTS_DIR, exist_ok=True)
+        profiler.dump_stats(report_path(report_id, 'prof'))
+        report = {
+            'id': report_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_time_ms': round(elapsed, 3),
+            **recorder.summary(),
+        }
+        with open(report_path(report_id, 'json'), 'w',
+                  encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        remove_old_reports()
+        response['X-Profile-Id'] = report_id
+        return response
@@ -0,0 +1,187 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Каждый запрос дольше SLOW_QUERY_THRESHOLD_MS пишется в лог
+api.slow_queries одной JSON-записью: маршрут, отпечаток
+нормализованного SQL и план EXPLAIN. EXPLAIN ANALYZE повторно выполняет
+запрос, поэтому включается только для доли SLOW_QUERY_ANALYZE_RATE
+медленных SELECT, а внутри транзакции выполняется в точке сохранения:
+его ошибка не обрывает транзакцию запроса. По отпечаткам в кеше копится
+сводка за SLOW_QUERY_STATS_TIMEOUT секунд, из которой администратор
+получает top-N по суммарному времени.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger('api.slow_queries')
+
+INDEX_KEY = 'slow_queries:index'
+
+NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+\b'), '?'),
+    (re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize(sql):
+    """SQL без литералов и с одинаковой записью списков IN."""
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:16]
+
+
+def explain(db, sql, params):
+    """План запроса без прохода через обёртки execute.
+
+    Возвращает план и признак того, что он получен с ANALYZE.
+    """
+    if db.vendor != 'postgresql':
+        return None, False
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None, False
+    analyze = random.random() < settings.SLOW_QUERY_ANALYZE_RATE
+    options = 'ANALYZE, FORMAT JSON' if analyze else 'FORMAT JSON'
+    try:
+        with transaction.atomic(using=db.alias):
+            cursor = db.connection.cursor()
+            try:
+                cursor.execute(f'EXPLAIN ({options}) {sql}', params)
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+    except DatabaseError as error:
+        return {'error': str(error)}, analyze
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan, analyze
+
+
+def stats_key(fingerprint, field):
+    return f'slow_queries:{fingerprint}:{field}'
+
+
+def increment(key, delta, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Ключ истёк между add и incr.
+        cache.set(key, delta, timeout)
+
+
+def summaries(fingerprints):
+    """Сводки отпечатков, ключи которых ещё не истекли."""
+    keys = [stats_key(fingerprint, field) for fingerprint in fingerprints
+            for field in ('info', 'count', 'total_us')]
+    values = cache.get_many(keys)
+    items = []
+    for fingerprint in fingerprints:
+        info = values.get(stats_key(fingerprint, 'info'))
+        count = values.get(stats_key(fingerprint, 'count'))
+        total_us = values.get(stats_key(fingerprint, 'total_us'))
+        if info is None or count is None or total_us is None:
+            continue
+        items.append({**info, 'count': count, 'total_ms': total_us / 1000})
+    return sorted(items, key=lambda item: item['total_ms'], reverse=True)
+
+
+def record(entry):
+    """Учёт медленного запроса в сводке по отпечаткам.
+
+    Число и суммарное время — отдельные ключи, их увеличивает cache.incr,
+    и параллельные воркеры не затирают записи друг друга. Список
+    отпечатков переписывается только при появлении нового и ограничен
+    SLOW_QUERY_TOP_N * 4 самыми дорогими.
+    """
+    timeout = settings.SLOW_QUERY_STATS_TIMEOUT
+    fingerprint = entry['fingerprint']
+    increment(stats_key(fingerprint, 'count'), 1, timeout)
+    increment(stats_key(fingerprint, 'total_us'),
+              round(entry['duration_ms'] * 1000), timeout)
+    info_key = stats_key(fingerprint, 'info')
+    info = cache.get(info_key) or {
+        'fingerprint': fingerprint, 'sql': entry['sql'], 'max_ms': 0
+    }
+    info['max_ms'] = max(info['max_ms'], entry['duration_ms'])
+    info['last_route'] = entry['route']
+    cache.set(info_key, info, timeout)
+    index = cache.get(INDEX_KEY, [])
+    if fingerprint in index:
+        return
+    index.append(fingerprint)
+    limit = settings.SLOW_QUERY_TOP_N * 4
+    if len(index) > limit:
+        index = [item['fingerprint'] for item in summaries(index)[:limit]]
+    cache.set(INDEX_KEY, index, timeout)
+
+
+def top_queries():
+    """Top-N отпечатков медленных запросов по суммарному времени."""
+    return summaries(cache.get(INDEX_KEY, []))[:settings.SLOW_QUERY_TOP_N]
+
+
+class SlowQueryLogger:
+    """Обёртка execute, отбирающая медленные запросы одного HTTP-запроса."""
+
+    def __init__(self, request):
+        self.request = request
+
+    def route(self):
+        match = self.request.resolver_match
+        if match is not None:
+            return f'{self.request.method} {match.route}'
+        return f'{self.request.method} {self.request.path}'
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = execute(sql, params, many, context)
+            failed = False
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= settings.SLOW_QUERY_THRESHOLD_MS and not many:
+                self.log(sql, params, duration, context['connection'],
+                         failed)
+        return result
+
+    def log(self, sql, params, duration, db, failed=False):
+        normalized = normalize(sql)
+        # После ошибки запроса транзакция Postgres не принимает EXPLAIN.
+        plan, analyzed = (None, False) if failed else explain(
+            db, sql, params
+        )
+        entry = {
+            'route': self.route(),
+            'fingerprint': fingerprint(normalized),
+            'sql': normalized,
+            'duration_ms': round(duration, 3),
+            'analyzed': analyzed,
+            'plan': plan,
+        }
+        logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
+        record(entry)
+
+
+class SlowQueryMiddleware:
+    """Подключение журнала медленных запросов на время HTTP-запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(SlowQueryLogger(request)):
+            return self.get_response(request)
@@ -0,0 +1,230 @@
+"""Предрендеренные ответы каталога для анонимных GET.
+
+Списки категорий и жанров и первые SNAPSHOT_PAGES страниц списка
+произведений (всех, по каждой категории и по каждому жанру)
+рендерятся теми же вьюсетами, что и обычные запросы, и пишутся
+в SNAPSHOT_DIR сжатыми .json.gz. Карточки произведений в снимки
+не входят: их GET считает просмотры (reviews.counters) и должен
+доходить до приложения. nginx отдаёт их анонимным GET
+без обращения к gunicorn, а если файла нет, проксирует запрос
+в приложение. Каждый файл заменяется атомарно через os.replace.
+
+Файлы обновляет команда build_snapshots --watch: она читает журнал
+изменений (reviews.changes) и перерендеривает только затронутые файлы.
+Перед рендером она сама сбрасывает кеши справочников и фрагментов
+изменённых объектов: записи другого процесса в кеш, видимый только ему,
+до неё не доходят.
+
+Имена файлов (их же строит map в infra/nginx/default.conf):
+    categories.json.gz, genres.json.gz
+    titles/all/first.json.gz, titles/all/l<limit>-o<offset>.json.gz
+    titles/category/<slug>/..., titles/genre/<slug>/...
+"""
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.urls import resolve
+from reviews.changes import changes_since, head_cursor, position, read_cursor
+from reviews.fragments import bump
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.taxonomy import category_cache, genre_cache
+
+# Признак рендера снимка в request.META: для него пагинатор считает
+# число строк заново, а не берёт из кеша.
+SNAPSHOT_META = 'yamdb.snapshot'
+
+API_PREFIX = '/api/v1/'
+ALL_TITLES = ('all', None)
+TAXONOMIES = {'category': Category, 'genre': Genre}
+
+
+def render(path, params=None):
+    """Статус и тело ответа API на анонимный GET."""
+    from django.test import RequestFactory
+
+    request = RequestFactory().get(
+        path, params or {}, HTTP_HOST=settings.SNAPSHOT_HOST,
+        **{SNAPSHOT_META: True}
+    )
+    request.resolver_match = resolve(path)
+    response = request.resolver_match.func(
+        request, *request.resolver_match.args,
+        **request.resolver_match.kwargs
+    )
+    response.render()
+    return response.status_code, response.content
+
+
+def snapshot_path(name):
+    return os.path.join(settings.SNAPSHOT_DIR, f'{name}.json.gz')
+
+
+def write(name, content):
+    """Атомарная запись сжатого снимка."""
+    path = snapshot_path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.',
+                                             suffix='.tmp')
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(gzip.compress(content, compresslevel=9, mtime=0))
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, path)
+
+
+def remove(name):
+    try:
+        os.remove(snapshot_path(name))
+    except FileNotFoundError:
+        pass
+
+
+def memberships(title_ids=None):
+    """Списки, в которые входят видимые произведения: id -> set ключей."""
+    titles = Title.objects.filter(is_hidden=False)
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    result = {}
+    for title_id, category_id in titles.values_list('pk', 'category_id'):
+        result[title_id] = {ALL_TITLES}
+        if category_id is not None:
+            result[title_id].add(('category', category_id))
+    for title_id, genre_id in GenreTitle.objects.filter(
+            title__in=titles.values('pk')).values_list('title_id', 'genre_id'):
+        result[title_id].add(('genre', genre_id))
+    return result
+
+
+class Snapshots:
+    """Набор снимков и то, что нужно для точечного обновления."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        # Каталог и id произведений на отрендеренных страницах списка.
+        self.lists = {}
+        self.members = {}
+
+    def page_params(self):
+        """Имена файлов страниц и параметры запроса, как в ссылках DRF."""
+        yield 'first', {}
+        for page in range(self.pages):
+            yield f'l{self.page_size}-o{page * self.page_size}', {
+                'limit': self.page_size, 'offset': page * self.page_size
+            } if page else {'limit': self.page_size}
+
+    def refresh_taxonomy(self, name):
+        status, content = render(f'{API_PREFIX}{name}/')
+        write(name, content)
+        return {name}
+
+    def list_location(self, key):
+        """Каталог снимков списка и параметр фильтра или None."""
+        kind, pk = key
+        if key == ALL_TITLES:
+            return 'titles/all', {}
+        slug = TAXONOMIES[kind].objects.filter(pk=pk).values_list(
+            'slug', flat=True
+        ).first()
+        if slug is None:
+            return None, None
+        return f'titles/{kind}/{slug}', {kind: slug}
+
+    def refresh_list(self, key):
+        directory, params = self.list_location(key)
+        previous = self.lists.pop(key, (None, set()))[0]
+        if previous and previous != directory:
+            shutil.rmtree(os.path.join(settings.SNAPSHOT_DIR, previous),
+                          ignore_errors=True)
+        if directory is None:
+            return set()
+        written, title_ids = set(), set()
+        for page, page_params in self.page_params():
+            name = f'{directory}/{page}'
+            status, content = render(f'{API_PREFIX}titles/',
+                                     {**params, **page_params})
+            results = json.loads(content).get('results') if (
+                status == 200) else None
+            if not results and page_params.get('offset'):
+                remove(name)
+                continue
+            write(name, content)
+            written.add(name)
+            title_ids.update(item['id'] for item in results or ())
+        self.lists[key] = (directory, title_ids)
+        return written
+
+    def build_all(self):
+        """Полная пересборка с удалением снимков, которых больше нет."""
+        self.lists = {}
+        self.members = memberships()
+        written = self.refresh_taxonomy('categories')
+        written |= self.refresh_taxonomy('genres')
+        keys = {ALL_TITLES}
+        for kind, model in TAXONOMIES.items():
+            keys.update((kind, pk) for pk in model.objects.values_list(
+                'pk', flat=True
+            ))
+        for key in keys:
+            written |= self.refresh_list(key)
+        self.remove_stale(written)
+        return len(written)
+
+    def remove_stale(self, written):
+        for root, _, files in os.walk(settings.SNAPSHOT_DIR):
+            for file in files:
+                path = os.path.join(root, file)
+                name = os.path.relpath(path, settings.SNAPSHOT_DIR)
+                if name.endswith('.json.gz') and name[:-8] not in written:
+                    os.remove(path)
+
+    def apply(self, changes):
+        """Обновление файлов, затронутых пачкой записей журнала."""
+        changed = {kind: set() for kind in ('title', 'category', 'genre')}
+        for change in changes:
+            if change.model in changed:
+                changed[change.model].add(change.object_id)
+        title_ids = changed['title'] | set(Title.objects.filter(
+            category_id__in=changed['category']
+        ).values_list('pk', flat=True)) | set(GenreTitle.objects.filter(
+            genre_id__in=changed['genre']
+        ).values_list('title_id', flat=True))
+        keys = {('category', pk) for pk in changed['category']}
+        keys |= {('genre', pk) for pk in changed['genre']}
+        current = memberships(title_ids)
+        for pk in title_ids:
+            before = self.members.pop(pk, set())
+            after = current.get(pk, set())
+            if after:
+                self.members[pk] = after
+            keys |= before ^ after
+        keys |= {key for key, (_, page_ids) in self.lists.items()
+                 if page_ids & title_ids}
+        bump(Title, title_ids)
+        if changed['category']:
+            category_cache.invalidate()
+            self.refresh_taxonomy('categories')
+        if changed['genre']:
+            genre_cache.invalidate()
+            self.refresh_taxonomy('genres')
+        for key in keys:
+            self.refresh_list(key)
+
+    def watch(self, interval):
+        """Полная сборка, затем обновление по журналу изменений."""
+        since = read_cursor(head_cursor())
+        self.build_all()
+        while True:
+            changes, _, has_more = changes_since(
+                since, settings.CHANGE_FEED_PAGE_SIZE
+            )
+            if changes:
+                self.apply(changes)
+                since = position(changes[-1])
+            if not has_more:
+                time.sleep(interval)
@@ -1,19 +1,114 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
+from reviews.models import GenreTitle, Title
+from reviews.taxonomy import category_cache, genre_cache
+from users.search import INFIX, INFIX_MIN_LENGTH, PREFIX, search_usernames
+
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+
+
+def split_slugs(value):
+    return list(dict.fromkeys(
+        slug.strip() for slug in value.split(',') if slug.strip()
+    ))
 
 
 class TitlesFilter(filters.FilterSet):
+    """Фильтр произведений.
+
+    genre и category принимают несколько слагов через запятую. Жанры
+    проверяются подзапросами IN/EXISTS по GenreTitle, а не JOIN:
+    строки произведений не размножаются, и рейтинг Avg не искажается.
+    genre_mode=all оставляет произведения со всеми указанными жанрами.
+    """
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
     category = filters.CharFilter(
-        field_name='category__slug'
+        method='filter_category'
     )
     genre = filters.CharFilter(
-        field_name='genre__slug'
+        method='filter_genre'
+    )
+    genre_mode = filters.ChoiceFilter(
+        choices=((GENRE_MODE_ANY, GENRE_MODE_ANY),
+                 (GENRE_MODE_ALL, GENRE_MODE_ALL)),
+        method='filter_genre_mode'
     )
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category', )
+        fields = ('name', 'year', 'year_min', 'year_max', 'genre',
+                  'genre_mode', 'category', )
+
+    def filter_category(self, queryset, name, value):
+        """Слаги переводятся в id по кешу, без JOIN с категориями."""
+        category_ids = [
+            category.pk for category in map(
+                category_cache.get_by_slug, split_slugs(value)
+            ) if category is not None
+        ]
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        """Слаги переводятся в id по кешу, без JOIN с жанрами."""
+        genres = [genre_cache.get_by_slug(slug)
+                  for slug in split_slugs(value)]
+        if self.form.cleaned_data.get('genre_mode') == GENRE_MODE_ALL:
+            if not genres or None in genres:
+                return queryset.none()
+            for genre in genres:
+                queryset = queryset.filter(Exists(GenreTitle.objects.filter(
+                    title_id=OuterRef('pk'), genre_id=genre.pk
+                )))
+            return queryset
+        genre_ids = [genre.pk for genre in genres if genre is not None]
+        if not genre_ids:
+            return queryset.none()
+        return queryset.filter(pk__in=GenreTitle.objects.filter(
+            genre_id__in=genre_ids
+        ).values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        """Режим учитывается в filter_genre."""
+        return queryset
+
+
+class UsernameSearchFilter(SearchFilter):
+    """?search= как у SearchFilter (icontains по search_fields).
+
+    С ?search_mode=prefix или infix — индексный поиск по началу или
+    части имени (users.search).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        mode = request.query_params.get('search_mode')
+        if mode is None:
+            return super().filter_queryset(request, queryset, view)
+        query = request.query_params.get('search', '').strip()
+        if not query:
+            return queryset
+        if mode not in (PREFIX, INFIX):
+            raise ValidationError({
+                'search_mode': f'Ожидается {PREFIX} или {INFIX}.'
+            })
+        if mode == INFIX and len(query) < INFIX_MIN_LENGTH:
+            raise ValidationError({'search': (
+                f'Для поиска по части имени нужно от {INFIX_MIN_LENGTH} '
+                'символов.'
+            )})
+        return search_usernames(queryset, query, mode)
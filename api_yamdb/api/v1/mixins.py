@@ -0,0 +1,112 @@
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from reviews import fragments
+
+from .permissions import IsAdminPermission
+from .renderers import NDJSONRenderer
+
+
+class CachedTaxonomyListMixin:
+    """Список справочника из in-process кеша, если нет поиска."""
+    taxonomy = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            return super().list(request, *args, **kwargs)
+        objects = self.taxonomy.all()
+        page = self.paginate_queryset(objects)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data)
+
+
+class FragmentCacheListMixin:
+    """Список из закешированных фрагментов отдельных объектов.
+
+    Из БД выбираются только id страницы, готовые представления берутся
+    из кеша одним запросом, сериализуются лишь отсутствующие объекты.
+    Если задан values_reader, они читаются через values() без
+    сериализатора (см. api.v1.readers).
+    """
+    values_reader = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset.values_list('pk', flat=True))
+        pks = list(queryset.values_list('pk', flat=True)
+                   if page is None else page)
+        data = self.get_fragment_data(queryset, pks)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_fragment_data(self, queryset, pks):
+        model = queryset.model
+        keys, found = fragments.get_fragments(model, pks)
+        missing = [pk for pk in pks if pk not in found]
+        if missing:
+            fresh = self.get_representations(queryset, missing)
+            fragments.set_fragments(keys, fresh)
+            found.update(fresh)
+        return [found[pk] for pk in pks if pk in found]
+
+    def get_representations(self, queryset, pks):
+        """Представления объектов pks: словарь id -> данные."""
+        if self.values_reader is not None:
+            return self.values_reader.read(queryset.filter(pk__in=pks))
+        serializer = self.get_serializer(
+            queryset.filter(pk__in=pks), many=True
+        )
+        return {item['id']: item for item in serializer.data}
+
+
+class NDJSONStreamListMixin:
+    """Потоковая выгрузка списка в NDJSON для доверенных клиентов.
+
+    Включается заголовком Accept: application/x-ndjson. Строки читаются
+    серверным курсором порциями по stream_chunk_size и отдаются через
+    StreamingHttpResponse без пагинации, поэтому память не растёт
+    вместе с размером выборки. Доступно только администраторам.
+    """
+    stream_chunk_size = 500
+    stream_select_related = ()
+    stream_prefetch_related = ()
+
+    def get_renderers(self):
+        return super().get_renderers() + [NDJSONRenderer()]
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != NDJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+        if not IsAdminPermission().has_permission(request, self):
+            self.permission_denied(
+                request, message='Потоковая выгрузка доступна '
+                                 'только администраторам.'
+            )
+        queryset = self.filter_queryset(self.get_queryset()).select_related(
+            *self.stream_select_related
+        )
+        return StreamingHttpResponse(
+            self.stream_rows(queryset),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    def stream_rows(self, queryset):
+        chunk = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                yield self.render_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield self.render_chunk(chunk)
+
+    def render_chunk(self, objects):
+        # iterator() не выполняет prefetch_related, догружаем порцией.
+        prefetch_related_objects(objects, *self.stream_prefetch_related)
+        serializer = self.get_serializer(objects, many=True)
+        return NDJSONRenderer().render(serializer.data)
@@ -0,0 +1,98 @@
+import hashlib
+
+from api.snapshots import SNAPSHOT_META
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+from reviews.paginators import planner_estimate
+
+
+class EstimatedCountPagination(LimitOffsetPagination):
+    """Пагинация с приблизительным или кешированным count.
+
+    Включается атрибутом approximate_count у вьюсета. Для списка без
+    фильтров count берётся из оценки планировщика Postgres, если она
+    больше approximate_threshold. Иначе точный COUNT кешируется на
+    count_cache_timeout секунд по тексту запроса с фильтрами.
+    Оценка или кеш могут отставать от таблицы, поэтому наличие следующей
+    страницы определяется не по count, а по limit + 1 выбранной строке.
+    Размер страницы ограничен max_limit, полная выгрузка делается
+    потоком NDJSON (см. NDJSONStreamListMixin).
+    """
+    max_limit = 1000
+    approximate_threshold = 1000
+    count_cache_timeout = 30
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.count_is_approximate = False
+        self.has_next = None
+        if not getattr(view, 'approximate_count', False):
+            return super().paginate_queryset(queryset, request, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        rows = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        page = rows[:self.limit]
+        # count не меньше уже увиденных строк.
+        if page:
+            self.count = max(self.count, self.offset + len(page)
+                             + self.has_next)
+        return page
+
+    def get_next_link(self):
+        if self.has_next is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param,
+                                   self.offset + self.limit)
+
+    def get_count(self, queryset):
+        if not getattr(self.view, 'approximate_count', False):
+            return super().get_count(queryset)
+        if not self.is_filtered():
+            estimate = planner_estimate(queryset)
+            if estimate is not None and estimate > self.approximate_threshold:
+                self.count_is_approximate = True
+                return estimate
+        return self.get_cached_count(queryset)
+
+    def is_filtered(self):
+        params = set(self.request.query_params)
+        return bool(params - {self.limit_query_param,
+                              self.offset_query_param})
+
+    def get_cached_count(self, queryset):
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+        key = f'count:{queryset.model._meta.label_lower}:{digest}'
+        count = cache.get(key)
+        # Снимок живёт дольше кеша, поэтому считается заново.
+        if count is None or self.request.META.get(SNAPSHOT_META):
+            count = super().get_count(queryset)
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if getattr(self.view, 'approximate_count', False):
+            response.data['count_is_approximate'] = self.count_is_approximate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_is_approximate'] = {'type': 'boolean'}
+        return schema
@@ -29,3 +29,10 @@ class IsAuthorAdminSuperuserOrReadOnlyPermission(permissions.BasePermission):
 class IsAdminPermission(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_admin
+
+
+class IsModeratorOrAdminPermission(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator
+        )
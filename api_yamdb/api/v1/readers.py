@@ -0,0 +1,101 @@
+"""Представления для списков через values() вместо сериализаторов.
+
+ModelSerializer на каждую строку создаёт экземпляр модели и обходит
+объекты полей. Для списков те же данные читаются через values_list()
+только нужных колонок, а словари ответа собираются по схеме, один раз
+составленной из полей сериализатора: ключ, колонка и to_representation
+поля. Поэтому ответ совпадает с ответом сериализатора
+(tests/test_readers.py).
+"""
+from django.utils.functional import cached_property
+from rest_framework.relations import RelatedField
+from rest_framework.serializers import BaseSerializer
+from reviews.models import Category, Genre, GenreTitle
+
+from .serializers import (CategorySerializer, CommentSerializer,
+                          GenreSerializer, ReadTitleSerializer,
+                          ReviewSerializer)
+
+
+class ValuesReader:
+    """Чтение представлений объектов queryset по схеме сериализатора.
+
+    columns задаёт колонку values() для поля, если она отличается от
+    имени поля. Связанные поля отдаются без преобразования, вложенные
+    сериализаторы заполняет complete().
+    """
+
+    def __init__(self, serializer_class, columns=None):
+        self.serializer_class = serializer_class
+        self.columns = columns or {}
+
+    @cached_property
+    def schema(self):
+        schema = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            convert = None if isinstance(
+                field, (RelatedField, BaseSerializer)
+            ) else field.to_representation
+            schema.append((name, self.columns.get(name, name), convert))
+        return tuple(schema)
+
+    def read(self, queryset):
+        """Словарь pk -> представление в порядке queryset."""
+        schema = self.schema
+        items = {}
+        for pk, *values in queryset.values_list(
+            'pk', *(column for _, column, _ in schema)
+        ):
+            items[pk] = {
+                name: value if value is None or convert is None
+                else convert(value)
+                for (name, _, convert), value in zip(schema, values)
+            }
+        return self.complete(items)
+
+    def complete(self, items):
+        return items
+
+
+class TitleReader(ValuesReader):
+    """Произведения с жанрами в порядке id и категорией.
+
+    Жанры и категории читаются отдельными запросами по id, без JOIN
+    к строкам произведений.
+    """
+
+    def __init__(self):
+        super().__init__(
+            ReadTitleSerializer, {'genre': 'pk', 'category': 'category_id'}
+        )
+
+    def complete(self, items):
+        genre_ids = {}
+        for title_id, genre_id in GenreTitle.objects.filter(
+            title_id__in=list(items)
+        ).order_by('genre_id').values_list('title_id', 'genre_id'):
+            genre_ids.setdefault(title_id, []).append(genre_id)
+        genres = genre_reader.read(Genre.objects.filter(
+            pk__in={pk for pks in genre_ids.values() for pk in pks}
+        ))
+        categories = category_reader.read(Category.objects.filter(
+            pk__in={item['category'] for item in items.values()}
+        ))
+        for pk, item in items.items():
+            item['genre'] = [genres[genre_id]
+                             for genre_id in genre_ids.get(pk, ())]
+            item['category'] = categories.get(item['category'])
+        return items
+
+
+category_reader = ValuesReader(CategorySerializer)
+genre_reader = ValuesReader(GenreSerializer)
+title_reader = TitleReader()
+review_reader = ValuesReader(
+    ReviewSerializer, {'title': 'title__name', 'author': 'author__username'}
+)
+comment_reader = ValuesReader(
+    CommentSerializer, {'author': 'author__username'}
+)
@@ -0,0 +1,25 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """По одному JSON-объекту на строку (application/x-ndjson)."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    @staticmethod
+    def render_line(item):
+        return json.dumps(
+            item, cls=JSONEncoder, ensure_ascii=False,
+            separators=(',', ':')
+        ).encode() + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            return b''.join(self.render_line(item) for item in data)
+        return self.render_line(data)
@@ -1,15 +1,36 @@
 import datetime as dt
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
-from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.settings import api_settings
+from reviews.models import (Category, Change, Comment, Genre, Review,
+                            SimilarTitle, Title)
+from reviews.taxonomy import category_cache, genre_cache
+from users.search import INFIX, INFIX_MIN_LENGTH, PREFIX, SEARCH_MODES
 
 User = get_user_model()
 
 
+class CachedSlugRelatedField(SlugRelatedField):
+    """Слаг жанра или категории из in-process кеша справочника."""
+
+    def __init__(self, taxonomy, **kwargs):
+        self.taxonomy = taxonomy
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = self.taxonomy.get_by_slug(data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=data)
+        return obj
+
+
 class TokenSerializer(serializers.Serializer):
     """Сериализатор для выдачи пользователю Токена."""
     username = serializers.RegexField(
@@ -105,21 +126,21 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Оценка по 10-бальной шкале!')
         return value
 
-    def validate(self, data):
-        request = self.context['request']
-        current_user = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title,
-                                      author=current_user).exists()
-        ):
-            raise ValidationError('Может существовать только один отзыв!')
-        return data
+    def create(self, validated_data):
+        """Вставка без предварительных проверок: дубликат отзыва
+        отсекает ограничение unique_review в БД."""
+        try:
+            with transaction.atomic(savepoint=False):
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Может существовать только один отзыв!'
+                ]
+            })
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
         model = Review
 
 
@@ -144,12 +165,14 @@ class TitleGETSerializer(serializers.ModelSerializer):
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор класса Title при остальных запросах."""
 
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
+        genre_cache,
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True
     )
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
+        category_cache,
         slug_field='slug',
         queryset=Category.objects.all()
     )
@@ -186,4 +209,84 @@ class ReadTitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id',
+            'description',
+            'genre',
+            'category',
+            'rating',
+            'name',
+            'year',
+            'views'
+        )
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Сериализатор похожего произведения."""
+    id = serializers.IntegerField(source='similar_id')
+    name = serializers.CharField(source='similar.name')
+    year = serializers.IntegerField(source='similar.year')
+
+    class Meta:
+        model = SimilarTitle
+        fields = ('id', 'name', 'year', 'score')
+
+
+class UserAutocompleteSerializer(serializers.Serializer):
+    """Параметры автодополнения имени пользователя."""
+
+    q = serializers.CharField(max_length=150)
+    mode = serializers.ChoiceField(choices=SEARCH_MODES, default=PREFIX)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.USER_AUTOCOMPLETE_MAX_LIMIT,
+        default=settings.USER_AUTOCOMPLETE_LIMIT
+    )
+
+    def validate(self, data):
+        if data['mode'] == INFIX and len(data['q']) < INFIX_MIN_LENGTH:
+            raise serializers.ValidationError({'q': (
+                f'Для поиска по части имени нужно от {INFIX_MIN_LENGTH} '
+                'символов.'
+            )})
+        return data
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    """Массовая модерация: что сделать и с какими строками.
+
+    Нужен хотя бы один фильтр из MODERATION_FILTERS, фильтры
+    объединяются через AND.
+    """
+    MODERATION_FILTERS = (
+        'ids', 'author', 'title_id', 'date_from', 'date_to', 'text'
+    )
+
+    target = serializers.ChoiceField(choices=('reviews', 'comments'))
+    action = serializers.ChoiceField(choices=('delete', 'hide'))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        required=False
+    )
+    author = serializers.CharField(required=False)
+    title_id = serializers.IntegerField(min_value=1, required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+    text = serializers.CharField(min_length=3, required=False)
+
+    def validate(self, data):
+        if not set(data) & set(self.MODERATION_FILTERS):
+            raise serializers.ValidationError(
+                'Укажите хотя бы один фильтр: '
+                f'{", ".join(self.MODERATION_FILTERS)}.'
+            )
+        return data
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    """Сериализатор записи ленты изменений."""
+
+    class Meta:
+        model = Change
+        fields = ('model', 'object_id', 'action', 'created')
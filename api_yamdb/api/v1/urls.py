@@ -1,6 +1,7 @@
-from api.v1.views import (CategoryViewSet, CommentViewSet, CustomUserViewSet,
-                          GenreViewSet, ReviewViewSet, SignUpViewSet,
-                          TitleViewSet, TokenViewSet)
+from api.v1.views import (CategoryViewSet, ChangeFeedViewSet, CommentViewSet,
+                          CustomUserViewSet, GenreViewSet, ModerationViewSet,
+                          ProfileReportViewSet, ReviewViewSet, SignUpViewSet,
+                          SlowQueryViewSet, TitleViewSet, TokenViewSet)
 from django.urls import include, path
 from rest_framework import routers
 
@@ -23,6 +24,10 @@ router_v1.register(
 router_v1.register('titles', TitleViewSet, basename='titles')
 router_v1.register('genres', GenreViewSet, basename='genres')
 router_v1.register('categories', CategoryViewSet, basename='categories')
+router_v1.register('profiles', ProfileReportViewSet, basename='profiles')
+router_v1.register('slow-queries', SlowQueryViewSet, basename='slow-queries')
+router_v1.register('moderation', ModerationViewSet, basename='moderation')
+router_v1.register('changes', ChangeFeedViewSet, basename='changes')
 
 urlpatterns = [
     path('auth/', include(router_v1_auth.urls)),
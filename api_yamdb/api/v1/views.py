@@ -1,27 +1,53 @@
+import os
+
+from api.profiling import report_path
+from api.slow_queries import top_queries
 from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator, get_user_model
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core import signing
+from django.core.cache import cache
 from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.changes import (CursorExpiredError, changes_since, head_cursor,
+                             read_cursor)
+from reviews.counters import title_views
+from reviews.deletion import (delete_comments, delete_reviews, hide_comments,
+                              hide_reviews, remove_titles, remove_users)
+from reviews.models import (Category, Comment, Genre, Review, SimilarTitle,
+                            Title)
+from reviews.taxonomy import category_cache, genre_cache
+from users.search import search_usernames
 
-from .filters import TitlesFilter
+from .facets import facets_cache_key, title_facets
+from .filters import TitlesFilter, UsernameSearchFilter
+from .mixins import (CachedTaxonomyListMixin, FragmentCacheListMixin,
+                     NDJSONStreamListMixin)
 from .permissions import (IsAdminPermission, IsAdminUserOrReadOnly,
-                          IsAuthorAdminSuperuserOrReadOnlyPermission)
-from .serializers import (CategorySerializer, CommentSerializer,
+                          IsAuthorAdminSuperuserOrReadOnlyPermission,
+                          IsModeratorOrAdminPermission)
+from .readers import comment_reader, review_reader, title_reader
+from .serializers import (BulkModerationSerializer, CategorySerializer,
+                          ChangeSerializer, CommentSerializer,
                           CustomUserSerializer, GenreSerializer,
                           ReadTitleSerializer, ReviewSerializer,
-                          SignUpSerializer, TitleSerializer, TokenSerializer)
+                          SignUpSerializer, SimilarTitleSerializer,
+                          TitleSerializer, TokenSerializer,
+                          UserAutocompleteSerializer)
+from .title_json import TITLE_RATING, ordered_genres, titles_json
 
 User = get_user_model()
 
@@ -44,6 +70,11 @@ class TokenViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
         if not default_token_generator.check_token(user, confirmation_code):
             message = {'confirmation_code': 'Код подтверждения невалиден'}
             return Response(message, status=status.HTTP_400_BAD_REQUEST)
+        # Код одноразовый: last_login входит в его хеш и отмечает
+        # подтверждённую регистрацию (см. purge_unconfirmed_signups).
+        user.last_login = timezone.now()
+        user.confirmation_code = None
+        user.save(update_fields=('last_login', 'confirmation_code'))
         message = {'token': str(AccessToken.for_user(user))}
         return Response(message, status=status.HTTP_200_OK)
 
@@ -66,6 +97,10 @@ class SignUpViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
                 'Такой логин или email уже существуют',
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if user.last_login is None:
+            # Срок жизни неподтверждённой регистрации отсчитывается
+            # от последнего запроса кода.
+            user.date_joined = timezone.now()
         confirmation_code = default_token_generator.make_token(user)
         user.confirmation_code = confirmation_code
         user.save()
@@ -83,13 +118,30 @@ class SignUpViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
 class CustomUserViewSet(viewsets.ModelViewSet):
     """Вьюсет для обьектов модели User."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_hidden=False)
     serializer_class = CustomUserSerializer
     permission_classes = (IsAdminPermission,)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (UsernameSearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
+    approximate_count = True
+
+    def perform_destroy(self, instance):
+        remove_users([instance.pk])
+
+    @action(detail=False, pagination_class=None, filter_backends=())
+    def autocomplete(self, request):
+        """Первые limit имён по началу или части q, без count."""
+        serializer = UserAutocompleteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        users = search_usernames(
+            self.get_queryset(), params['q'], params['mode']
+        )
+        return Response(list(
+            users.values('username', 'email', 'role')[:params['limit']]
+        ))
 
     @action(
         detail=False,
@@ -113,58 +165,179 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    NDJSONStreamListMixin,
+    FragmentCacheListMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для Оставления Отзывов."""
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthorAdminSuperuserOrReadOnlyPermission,
         permissions.IsAuthenticatedOrReadOnly
     )
+    approximate_count = True
+    values_reader = review_reader
+    stream_select_related = ('title', 'author')
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        title = get_object_or_404(Title, id=self.kwargs.get('title_id'),
+                                  is_hidden=False)
+        return title.reviews.filter(is_hidden=False, author__is_hidden=False)
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        """Отзыв создаётся по title_id из URL без загрузки произведения,
+        название для ответа читается тем же запросом-проверкой."""
+        title_id = self.kwargs.get('title_id')
+        with transaction.atomic():
+            review = serializer.save(
+                author=self.request.user, title_id=title_id
+            )
+            review.title = get_object_or_404(
+                Title.objects.only('name'), id=title_id, is_hidden=False
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    NDJSONStreamListMixin,
+    FragmentCacheListMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для Оставления комментариев."""
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthorAdminSuperuserOrReadOnlyPermission,
         permissions.IsAuthenticatedOrReadOnly
     )
+    approximate_count = True
+    values_reader = comment_reader
+    stream_select_related = ('author', )
 
     def get_queryset(self):
         review = get_object_or_404(Review,
                                    id=self.kwargs.get('review_id'),
-                                   title_id=self.kwargs.get('title_id'))
-        return review.comments.all()
+                                   title_id=self.kwargs.get('title_id'),
+                                   title__is_hidden=False,
+                                   is_hidden=False,
+                                   author__is_hidden=False)
+        return review.comments.filter(is_hidden=False,
+                                      author__is_hidden=False)
 
     def perform_create(self, serializer):
         review = get_object_or_404(Review,
                                    id=self.kwargs.get('review_id'),
-                                   title_id=self.kwargs.get('title_id'))
+                                   title_id=self.kwargs.get('title_id'),
+                                   title__is_hidden=False,
+                                   is_hidden=False,
+                                   author__is_hidden=False)
         serializer.save(author=self.request.user, review=review)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    NDJSONStreamListMixin,
+    FragmentCacheListMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет для Добавления произведений."""
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    # Жанры в порядке id, как в titles_json и TitleReader.
+    queryset = Title.objects.filter(is_hidden=False).annotate(
+        rating=TITLE_RATING
+    ).prefetch_related(ordered_genres())
     permission_classes = (IsAdminUserOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, )
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitlesFilter
+    ordering_fields = ('views', )
+    lookup_value_regex = r'\d+'
+    approximate_count = True
+    values_reader = title_reader
+    stream_select_related = ('category', )
+    stream_prefetch_related = (ordered_genres(), )
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return ReadTitleSerializer
         return TitleSerializer
 
+    def perform_destroy(self, instance):
+        remove_titles([instance.pk])
+
+    def retrieve(self, request, *args, **kwargs):
+        """Произведение со счётом просмотра в буфере воркера."""
+        if settings.TITLES_SQL_JSON:
+            titles = titles_json(Title.objects.filter(
+                pk=kwargs[self.lookup_field], is_hidden=False
+            ))
+            if not titles:
+                raise Http404
+            data = titles.popitem()[1]
+        else:
+            data = self.get_serializer(self.get_object()).data
+        title_views.hit(data['id'])
+        return Response(data)
+
+    def get_representations(self, queryset, pks):
+        if not settings.TITLES_SQL_JSON:
+            return super().get_representations(queryset, pks)
+        return titles_json(Title.objects.filter(pk__in=pks))
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' in request.query_params:
+            return self.multi_get(request.query_params['ids'])
+        return super().list(request, *args, **kwargs)
+
+    def multi_get(self, raw_ids):
+        """Произведения по списку id в порядке запроса.
+
+        Отсутствующие и скрытые id возвращаются в missing.
+        """
+        try:
+            ids = list(dict.fromkeys(
+                int(value) for value in raw_ids.split(',') if value.strip()
+            ))
+        except ValueError:
+            raise ValidationError({'ids': 'Ожидается список целых id.'})
+        if len(ids) > settings.TITLES_MULTI_GET_LIMIT:
+            raise ValidationError({'ids': (
+                f'Не больше {settings.TITLES_MULTI_GET_LIMIT} id за запрос.'
+            )})
+        queryset = self.get_queryset().select_related('category')
+        existing = set(queryset.filter(pk__in=ids).values_list(
+            'pk', flat=True
+        ))
+        found = {item['id']: item for item in self.get_fragment_data(
+            queryset, [pk for pk in ids if pk in existing]
+        )}
+        return Response({
+            'results': [found[pk] for pk in ids if pk in found],
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+    @action(detail=False, pagination_class=None)
+    def facets(self, request):
+        """Счётчики по жанрам, категориям и годам для текущего фильтра."""
+        key = facets_cache_key(request.query_params)
+        data = cache.get(key)
+        if data is None:
+            data = title_facets(self.filter_queryset(
+                Title.objects.filter(is_hidden=False)
+            ))
+            cache.set(key, data, settings.TITLE_FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
+    @action(detail=True, pagination_class=None)
+    def similar(self, request, pk=None):
+        """Похожие произведения из предрассчитанной таблицы."""
+        get_object_or_404(Title.objects.only('pk'), pk=pk, is_hidden=False)
+        similar = SimilarTitle.objects.filter(
+            title_id=pk, similar__is_hidden=False
+        ).select_related('similar').only(
+            'similar_id', 'score', 'similar__name', 'similar__year'
+        ).order_by('rank')
+        return Response(SimilarTitleSerializer(similar, many=True).data)
+
 
 class CategoryViewSet(
+    CachedTaxonomyListMixin,
     CreateModelMixin,
     ListModelMixin,
     GenericViewSet,
@@ -177,9 +350,11 @@ class CategoryViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = ('slug')
+    taxonomy = category_cache
 
 
 class GenreViewSet(
+    CachedTaxonomyListMixin,
     CreateModelMixin,
     ListModelMixin,
     GenericViewSet,
@@ -192,3 +367,121 @@ class GenreViewSet(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    taxonomy = genre_cache
+
+
+class ProfileReportViewSet(viewsets.ViewSet):
+    """Скачивание отчётов профилирования запросов."""
+    permission_classes = (IsAdminPermission,)
+    lookup_value_regex = '[0-9a-f]{32}'
+
+    def retrieve(self, request, pk=None):
+        """Сводка по SQL и времени выполнения запроса."""
+        return self.report_file(pk, 'json', as_attachment=False)
+
+    @action(detail=True, methods=['get'])
+    def pstats(self, request, pk=None):
+        """Дамп cProfile для pstats или snakeviz."""
+        return self.report_file(pk, 'prof', as_attachment=True)
+
+    @staticmethod
+    def report_file(report_id, extension, as_attachment):
+        path = report_path(report_id, extension)
+        if not os.path.exists(path):
+            raise Http404
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=as_attachment,
+            filename=os.path.basename(path)
+        )
+
+
+class SlowQueryViewSet(viewsets.ViewSet):
+    """Top-N медленных запросов по суммарному времени."""
+    permission_classes = (IsAdminPermission,)
+
+    def list(self, request):
+        return Response(top_queries(), status=status.HTTP_200_OK)
+
+
+class ModerationViewSet(viewsets.ViewSet):
+    """Массовое удаление или скрытие отзывов и комментариев.
+
+    Совпавшие строки обрабатываются множественными UPDATE/DELETE без
+    проверок по каждому объекту. Удаление больше MODERATION_SYNC_LIMIT
+    строк заменяется скрытием, сами строки затем порциями удаляет
+    команда purge_hidden.
+    """
+    permission_classes = (IsModeratorOrAdminPermission,)
+    targets = {
+        'reviews': (Review, 'title_id', delete_reviews, hide_reviews),
+        'comments': (Comment, 'review__title_id', delete_comments,
+                     hide_comments),
+    }
+
+    def create(self, request):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        model, title_lookup, delete, hide = self.targets[data['target']]
+        lookups = {
+            'pk__in': data.get('ids'),
+            'author__username': data.get('author'),
+            title_lookup: data.get('title_id'),
+            'pub_date__gte': data.get('date_from'),
+            'pub_date__lte': data.get('date_to'),
+            'text__icontains': data.get('text'),
+        }
+        queryset = model.objects.filter(is_hidden=False, **{
+            lookup: value for lookup, value in lookups.items()
+            if value is not None
+        })
+        matched = queryset.count()
+        deferred = (data['action'] == 'delete'
+                    and matched > settings.MODERATION_SYNC_LIMIT)
+        if data['action'] == 'delete' and not deferred:
+            delete(queryset)
+        else:
+            hide(queryset)
+        return Response(
+            {'matched': matched, 'action': data['action'],
+             'deferred': deferred},
+            status=status.HTTP_202_ACCEPTED if deferred else status.HTTP_200_OK
+        )
+
+
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """Лента изменений каталога для зеркалирующих клиентов.
+
+    Без since возвращается курсор на текущий конец журнала: клиент
+    выгружает коллекции и дальше запрашивает ?since=<cursor>.
+    """
+
+    def list(self, request):
+        since = request.query_params.get('since')
+        if since is None:
+            return Response(
+                {'results': [], 'cursor': head_cursor(), 'has_more': False}
+            )
+        try:
+            position = read_cursor(since)
+        except CursorExpiredError:
+            return Response(
+                {'detail': 'Курсор устарел, нужна полная синхронизация.'},
+                status=status.HTTP_410_GONE
+            )
+        except signing.BadSignature:
+            raise ValidationError({'since': 'Некорректный курсор.'})
+        try:
+            limit = int(request.query_params.get(
+                'limit', settings.CHANGE_FEED_PAGE_SIZE
+            ))
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        limit = min(max(limit, 1), settings.CHANGE_FEED_PAGE_SIZE)
+        changes, cursor, has_more = changes_since(position, limit)
+        return Response({
+            'results': ChangeSerializer(changes, many=True).data,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
@@ -32,14 +32,20 @@ AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'api.middleware.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
+    'api.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сессия, CSRF, пользователь из сессии и сообщения нужны только админке:
+# запросы с этим префиксом их пропускают (см. api.middleware).
+API_PATH_PREFIX = '/api/'
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -73,6 +79,30 @@ DATABASES = {
     }
 }
 
+# Для нескольких воркеров нужен общий кеш (в docker-compose - memcached):
+# через него сверяются версии справочников и сбрасываются кеши. Кеши из
+# PROCESS_LOCAL_CACHES видит только один процесс, с ними gunicorn
+# не запускается больше чем с одним воркером (см. gunicorn.conf.py).
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+# Время жизни сериализованных фрагментов произведений, отзывов и
+# комментариев. Устаревшие фрагменты отсекает версия в ключе.
+FRAGMENT_CACHE_TIMEOUT = int(
+    os.getenv('FRAGMENT_CACHE_TIMEOUT', default=24 * 60 * 60)
+)
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,7 +135,7 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
-SV_FILES_DIR = os.path.join(BASE_DIR, 'static/data')
+CSV_FILES_DIR = os.path.join(BASE_DIR, 'static/data')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -114,7 +144,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PAGINATION_CLASS': 'api.v1.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 3
 }
 
@@ -124,3 +157,74 @@ SIMPLE_JWT = {
 }
 
 SENDER_EMAIL = "MAILER-DAEMON@yandex.ru"
+
+# Каталог отчётов профилирования запросов (см. api.profiling) и число
+# хранимых в нём последних отчётов.
+PROFILE_REPORTS_DIR = os.getenv(
+    'PROFILE_REPORTS_DIR', default=os.path.join(BASE_DIR, 'profiles')
+)
+PROFILE_REPORTS_LIMIT = int(os.getenv('PROFILE_REPORTS_LIMIT', default=50))
+
+# Журнал медленных SQL-запросов (см. api.slow_queries).
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.getenv('SLOW_QUERY_THRESHOLD_MS', default=200)
+)
+SLOW_QUERY_ANALYZE_RATE = float(
+    os.getenv('SLOW_QUERY_ANALYZE_RATE', default=0)
+)
+SLOW_QUERY_TOP_N = 50
+SLOW_QUERY_STATS_TIMEOUT = int(
+    os.getenv('SLOW_QUERY_STATS_TIMEOUT', default=24 * 60 * 60)
+)
+
+# Скрывать произведения и пользователей при удалении, а зависимые строки
+# удалять порциями командой purge_hidden.
+DEFERRED_DELETE = os.getenv('DEFERRED_DELETE', default='False') == 'True'
+
+# Чтение произведений JSON, собранным в Postgres (см. api.v1.title_json).
+TITLES_SQL_JSON = os.getenv('TITLES_SQL_JSON', default='False') == 'True'
+
+# Максимум id в одном запросе /titles/?ids=.
+TITLES_MULTI_GET_LIMIT = 200
+
+# Массовая модерация удаляет сразу не больше стольких строк, остальное
+# скрывается до purge_hidden.
+MODERATION_SYNC_LIMIT = 5000
+
+# Сброс буфера просмотров произведений в БД (см. reviews.counters).
+VIEW_COUNTS_FLUSH_INTERVAL = int(
+    os.getenv('VIEW_COUNTS_FLUSH_INTERVAL', default=30)
+)
+VIEW_COUNTS_FLUSH_THRESHOLD = 1000
+
+# Лента изменений каталога (см. reviews.changes): срок хранения журнала,
+# окно ожидания незакоммиченных транзакций (без Postgres) и размер
+# страницы.
+CHANGE_LOG_RETENTION_DAYS = int(
+    os.getenv('CHANGE_LOG_RETENTION_DAYS', default=14)
+)
+CHANGE_FEED_SETTLE_SECONDS = 5
+CHANGE_FEED_PAGE_SIZE = 500
+
+# Статические снимки каталога для nginx (см. api.snapshots): каталог
+# в томе статики, хост для ссылок пагинации, число первых страниц
+# списков и пауза между опросами журнала изменений.
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'static', 'snapshots')
+SNAPSHOT_HOST = os.getenv('SNAPSHOT_HOST', default='')
+SNAPSHOT_PAGES = int(os.getenv('SNAPSHOT_PAGES', default=3))
+SNAPSHOT_REFRESH_INTERVAL = 5
+
+# Автодополнение имён пользователей: размер ответа по умолчанию и предел.
+USER_AUTOCOMPLETE_LIMIT = 10
+USER_AUTOCOMPLETE_MAX_LIMIT = 50
+
+# Фасетные счётчики произведений (см. api.v1.facets): время жизни кеша
+# и ширина интервала лет.
+TITLE_FACETS_CACHE_TIMEOUT = 60
+TITLE_FACETS_YEAR_BUCKET = 10
+
+# Через сколько дней удалять регистрации без полученного токена
+# (команда purge_signups).
+UNCONFIRMED_SIGNUP_MAX_AGE_DAYS = float(
+    os.getenv('UNCONFIRMED_SIGNUP_MAX_AGE_DAYS', default=7)
+)
@@ -1,7 +1,16 @@
 import os
+from importlib import import_module
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
 application = get_wsgi_application()
+
+# URLconf с вьюсетами API импортируется сразу: под gunicorn --preload это
+# происходит один раз в мастере, и воркеры стартуют прогретыми.
+# manage.py загружает URLconf при системных проверках (check_url_config),
+# поэтому команды для cron проверки отключают (requires_system_checks).
+if os.getenv('WSGI_WARMUP', default='True') == 'True':
+    import_module(settings.ROOT_URLCONF)
@@ -0,0 +1,28 @@
+"""Настройки gunicorn, читаются из рабочего каталога /app."""
+import os
+import sys
+
+
+def on_starting(server):
+    """Отказ от старта нескольких воркеров с кешем одного процесса.
+
+    Версии справочников и фрагментов живут в кеше Django: с LocMemCache
+    запись в одном воркере не сбрасывает кеши остальных, и они отдают
+    устаревшие данные.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend in settings.PROCESS_LOCAL_CACHES:
+        raise RuntimeError(
+            f'{backend} не общий для {server.cfg.workers} воркеров: '
+            'задайте CACHE_BACKEND и CACHE_LOCATION (например, memcached).'
+        )
+
+
+def worker_exit(server, worker):
+    """Сброс просмотров, накопленных воркером (см. reviews.counters)."""
+    counters = sys.modules.get('reviews.counters')
+    if counters is not None:
+        counters.title_views.flush()
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
+from .deletion import FastDeleteAdminMixin, remove_titles
 from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .paginators import EstimatedCountPaginator
 
 
 @admin.register(Category)
@@ -16,23 +18,42 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
-    list_display = ('name', 'year', 'description',)
-    list_filter = ('genre', 'category')
+class TitleAdmin(FastDeleteAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'year', 'description', 'is_hidden',)
+    list_filter = ('genre', 'category', 'is_hidden')
+    search_fields = ('=name',)
+    remove_func = staticmethod(remove_titles)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(GenreTitle)
 class GenreTitleAdmin(admin.ModelAdmin):
     list_display = ('title', 'genre',)
+    list_select_related = ('title', 'genre')
+    raw_id_fields = ('title',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ('title', 'text', 'author', 'score', 'pub_date')
-    search_fields = ('title', 'text')
+    list_display = ('title', 'text', 'author', 'score', 'pub_date',
+                    'is_hidden')
+    list_filter = ('is_hidden',)
+    list_select_related = ('title', 'author')
+    search_fields = ('=title__name', '=author__username')
+    raw_id_fields = ('title', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('review', 'text', 'author', 'pub_date')
-    search_fields = ('text',)
+    list_display = ('review', 'text', 'author', 'pub_date', 'is_hidden')
+    list_filter = ('is_hidden',)
+    list_select_related = ('review', 'author')
+    search_fields = ('=author__username',)
+    raw_id_fields = ('review', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,29 @@
+"""Общие приёмы для массовой загрузки данных командами управления."""
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, models
+
+
+@contextmanager
+def raw_dates(model):
+    """Сохранение дат из источника вместо подстановки auto_now_add."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField) and field.auto_now_add
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequence(model):
+    """Сдвиг последовательности id после вставки явных ключей."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
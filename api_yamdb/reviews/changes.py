@@ -0,0 +1,121 @@
+"""Лента изменений каталога для зеркалирующих клиентов.
+
+Журнал Change пополняют триггеры БД. Клиент получает непрозрачный
+курсор (подписанные позиция последней записи и время выдачи) и дальше
+запрашивает только изменения после него. Позиция — пара (txid, id).
+В Postgres записи отдаются по возрастанию номера транзакции и id, но
+только транзакций ниже xmin текущего снимка: все они уже завершены,
+а новые записи получат txid не меньше xmin, поэтому ни одна не окажется
+позади курсора, сколько бы ни шла транзакция. В SQLite txid нет,
+записи отдаются по id, но не дальше первой записи моложе
+CHANGE_FEED_SETTLE_SECONDS. Журнал хранится CHANGE_LOG_RETENTION_DAYS
+дней, курсор старше этого срока считается просроченным.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .models import Change
+
+CURSOR_SALT = 'reviews.changes'
+
+
+class CursorExpiredError(Exception):
+    """Часть изменений после курсора могла быть удалена из журнала."""
+
+
+def retention():
+    return timedelta(days=settings.CHANGE_LOG_RETENTION_DAYS)
+
+
+def settle():
+    return timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+
+
+def make_cursor(position):
+    return signing.dumps(list(position), salt=CURSOR_SALT)
+
+
+def read_cursor(cursor):
+    """Позиция из курсора; signing.BadSignature для чужой строки."""
+    try:
+        txid, change_id = signing.loads(cursor, salt=CURSOR_SALT,
+                                        max_age=retention() - settle())
+    except signing.SignatureExpired:
+        raise CursorExpiredError
+    except TypeError:
+        # Курсор по одному id выдан до учёта транзакций.
+        raise CursorExpiredError
+    return txid, change_id
+
+
+def position(change):
+    return change.txid or 0, change.id
+
+
+def uses_txid():
+    return connection.vendor == 'postgresql'
+
+
+def snapshot_xmin():
+    """Наименьший txid ещё не завершённых транзакций."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT txid_snapshot_xmin(txid_current_snapshot())')
+        return cursor.fetchone()[0]
+
+
+def first_unsettled_id(changes):
+    """id первой записи моложе окна ожидания коммитов."""
+    return changes.filter(
+        created__gt=timezone.now() - settle()
+    ).aggregate(first_id=Min('id'))['first_id']
+
+
+def head_cursor():
+    """Курсор на текущий конец журнала для начала синхронизации."""
+    if uses_txid():
+        return make_cursor((snapshot_xmin(), 0))
+    unsettled = first_unsettled_id(Change.objects.all())
+    if unsettled is not None:
+        return make_cursor((0, unsettled - 1))
+    last_id = Change.objects.aggregate(last_id=Max('id'))['last_id']
+    return make_cursor((0, last_id or 0))
+
+
+def settled_since(since):
+    """Завершённые записи после позиции since в порядке выдачи."""
+    txid, change_id = since
+    if uses_txid():
+        return Change.objects.filter(
+            Q(txid__gt=txid) | Q(txid=txid, id__gt=change_id),
+            txid__lt=snapshot_xmin()
+        ).order_by('txid', 'id')
+    changes = Change.objects.filter(id__gt=change_id)
+    unsettled = first_unsettled_id(changes)
+    if unsettled is not None:
+        changes = changes.filter(id__lt=unsettled)
+    return changes.order_by('id')
+
+
+def changes_since(since, limit):
+    """Страница изменений после позиции since, курсор и признак продолжения."""
+    page = list(settled_since(since)[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    return page, make_cursor(position(page[-1]) if page else since), has_more
+
+
+def purge_changes(chunk_size):
+    """Удаление записей старше срока хранения порциями."""
+    outdated = Change.objects.filter(created__lt=timezone.now() - retention())
+    deleted = 0
+    while True:
+        pks = list(outdated.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += Change.objects.filter(pk__in=pks).delete()[0]
@@ -0,0 +1,109 @@
+"""Буферизованный счётчик просмотров произведений.
+
+UPDATE строки reviews_title на каждый GET выстраивал бы самые частые
+чтения в очередь на блокировке строки. Поэтому просмотры копятся
+в памяти воркера, а раз в VIEW_COUNTS_FLUSH_INTERVAL секунд (или после
+VIEW_COUNTS_FLUSH_THRESHOLD просмотров) по окончании запроса
+сбрасываются в БД одним UPDATE с CASE по id. Воркер без запросов
+сбрасывает буфер из фонового потока. При падении воркера теряются
+только просмотры с последнего сброса; при штатной остановке буфер
+сбрасывают хук worker_exit в gunicorn.conf.py и atexit.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, F, Value, When
+
+from . import fragments
+from .models import Title
+
+logger = logging.getLogger(__name__)
+
+
+def add_views(deltas):
+    """Прибавление просмотров {id: delta} одним UPDATE."""
+    Title.objects.filter(pk__in=list(deltas)).update(views=F('views') + Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+        default=Value(0)
+    ))
+
+
+class ViewCounter:
+    """Просмотры, накопленные воркером с последнего сброса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.hits = 0
+        self.flushed_at = time.monotonic()
+        self.flusher_pid = None
+
+    def hit(self, pk):
+        with self.lock:
+            self.pending[pk] += 1
+            self.hits += 1
+            if self.flusher_pid != os.getpid():
+                self.start_flusher()
+
+    def start_flusher(self):
+        """Фоновый поток сброса в текущем процессе.
+
+        Запускается при первом просмотре, а не при импорте: в форкнутый
+        воркер потоки родителя не переходят.
+        """
+        self.flusher_pid = os.getpid()
+        threading.Thread(target=self.flush_periodically,
+                         name='title-views-flush', daemon=True).start()
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(settings.VIEW_COUNTS_FLUSH_INTERVAL)
+            try:
+                self.flush_if_due()
+            except Exception:
+                logger.exception('Фоновый сброс просмотров не удался')
+            finally:
+                close_old_connections()
+
+    def is_due(self):
+        return self.hits > 0 and (
+            self.hits >= settings.VIEW_COUNTS_FLUSH_THRESHOLD
+            or time.monotonic() - self.flushed_at
+            >= settings.VIEW_COUNTS_FLUSH_INTERVAL
+        )
+
+    def flush(self):
+        with self.lock:
+            deltas, self.pending = self.pending, Counter()
+            self.hits = 0
+            self.flushed_at = time.monotonic()
+        if not deltas:
+            return
+        try:
+            add_views(deltas)
+        except DatabaseError:
+            logger.exception('Не удалось сохранить просмотры, повтор позже')
+            with self.lock:
+                self.pending.update(deltas)
+                self.hits += sum(deltas.values())
+            return
+        fragments.bump(Title, deltas)
+
+    def flush_if_due(self, **kwargs):
+        if self.is_due():
+            self.flush()
+
+
+title_views = ViewCounter()
+
+request_finished.connect(
+    title_views.flush_if_due, dispatch_uid='reviews.counters.flush'
+)
+atexit.register(title_views.flush)
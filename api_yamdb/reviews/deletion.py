@@ -0,0 +1,202 @@
+"""Быстрое каскадное удаление произведений и пользователей.
+
+Стандартный Collector Django загружает в память каждый связанный отзыв
+и комментарий. Здесь зависимые строки удаляются множественными DELETE
+без загрузки объектов, а сама строка удаляется уже без потомков.
+Тем же каскадом удаляют объекты админки с FastDeleteAdminMixin.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import facets, fragments
+from .models import Comment, GenreTitle, Review, SimilarTitle, Title
+
+User = get_user_model()
+
+
+def _raw_delete(queryset):
+    """Один DELETE по условию queryset, без сигналов и Collector."""
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_titles(title_ids):
+    """Удаление произведений вместе с отзывами и комментариями."""
+    with transaction.atomic():
+        _raw_delete(Comment.objects.filter(review__title_id__in=title_ids))
+        _raw_delete(Review.objects.filter(title_id__in=title_ids))
+        _raw_delete(GenreTitle.objects.filter(title_id__in=title_ids))
+        _raw_delete(SimilarTitle.objects.filter(title_id__in=title_ids))
+        _raw_delete(SimilarTitle.objects.filter(similar_id__in=title_ids))
+        Title.objects.filter(pk__in=title_ids).delete()
+
+
+def delete_users(user_ids):
+    """Удаление пользователей вместе с их отзывами и комментариями."""
+    title_ids = _reviewed_title_ids(Review.objects.filter(
+        author_id__in=user_ids
+    ))
+    with transaction.atomic():
+        _raw_delete(Comment.objects.filter(author_id__in=user_ids))
+        _raw_delete(Comment.objects.filter(review__author_id__in=user_ids))
+        _raw_delete(Review.objects.filter(author_id__in=user_ids))
+        User.objects.filter(pk__in=user_ids).delete()
+    fragments.bump(Title, title_ids)
+
+
+def _reviewed_title_ids(reviews):
+    """Произведения, у которых изменится рейтинг после удаления отзывов."""
+    return list(reviews.values_list('title_id', flat=True).distinct())
+
+
+def hide_titles(title_ids):
+    """Мгновенное скрытие произведений до фоновой очистки."""
+    Title.objects.filter(pk__in=title_ids).update(is_hidden=True)
+    facets.invalidate()
+
+
+def hide_users(user_ids):
+    """Мгновенное скрытие и блокировка пользователей до фоновой очистки.
+
+    Отзывы скрытых пользователей сразу перестают учитываться в рейтинге,
+    поэтому фрагменты их произведений устаревают.
+    """
+    title_ids = _reviewed_title_ids(Review.objects.filter(
+        author_id__in=user_ids
+    ))
+    User.objects.filter(pk__in=user_ids).update(
+        is_hidden=True, is_active=False
+    )
+    fragments.bump(Title, title_ids)
+
+
+def remove_titles(title_ids):
+    """Удаление произведений сразу или через скрытие по настройке."""
+    if settings.DEFERRED_DELETE:
+        hide_titles(title_ids)
+    else:
+        delete_titles(title_ids)
+
+
+def remove_users(user_ids):
+    """Удаление пользователей сразу или через скрытие по настройке."""
+    if settings.DEFERRED_DELETE:
+        hide_users(user_ids)
+    else:
+        delete_users(user_ids)
+
+
+class FastDeleteAdminMixin:
+    """Удаление из админки через быстрый каскад без Collector."""
+    remove_func = None
+
+    def delete_model(self, request, obj):
+        self.remove_func([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        self.remove_func(list(queryset.values_list('pk', flat=True)))
+
+    def get_deleted_objects(self, objs, request):
+        """Подтверждение удаления без обхода всех связанных объектов."""
+        objs = list(objs)
+        model_count = {self.model._meta.verbose_name_plural: len(objs)}
+        return [str(obj) for obj in objs], model_count, set(), []
+
+
+def delete_reviews(reviews):
+    """Удаление отзывов queryset вместе с комментариями."""
+    title_ids = _reviewed_title_ids(reviews)
+    review_ids = reviews.values('pk')
+    with transaction.atomic():
+        _raw_delete(Comment.objects.filter(review__in=review_ids))
+        _raw_delete(Review.objects.filter(pk__in=review_ids))
+    fragments.bump(Title, title_ids)
+
+
+def hide_reviews(reviews):
+    """Скрытие отзывов queryset до фоновой очистки."""
+    title_ids = _reviewed_title_ids(reviews)
+    reviews.update(is_hidden=True)
+    fragments.bump(Title, title_ids)
+
+
+def delete_comments(comments):
+    """Удаление комментариев queryset одним DELETE."""
+    _raw_delete(comments)
+
+
+def hide_comments(comments):
+    """Скрытие комментариев queryset до фоновой очистки."""
+    comments.update(is_hidden=True)
+
+
+def _delete_in_chunks(queryset, chunk_size):
+    """Удаление строк queryset порциями, каждая в своей транзакции."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += _raw_delete(model.objects.filter(pk__in=pks))
+
+
+def purge_hidden(chunk_size):
+    """Фоновая очистка скрытых произведений, пользователей, отзывов
+    и комментариев порциями.
+
+    Возвращает словарь с количеством удалённых строк по моделям.
+    """
+    hidden_titles = Title.objects.filter(is_hidden=True).values('pk')
+    hidden_users = User.objects.filter(is_hidden=True).values('pk')
+    title_ids = _reviewed_title_ids(Review.objects.filter(
+        author__in=hidden_users
+    ))
+    stats = {
+        'comments': (
+            _delete_in_chunks(
+                Comment.objects.filter(review__title__in=hidden_titles),
+                chunk_size
+            )
+            + _delete_in_chunks(
+                Comment.objects.filter(author__in=hidden_users), chunk_size
+            )
+            + _delete_in_chunks(
+                Comment.objects.filter(review__author__in=hidden_users),
+                chunk_size
+            )
+            + _delete_in_chunks(
+                Comment.objects.filter(review__is_hidden=True), chunk_size
+            )
+            + _delete_in_chunks(
+                Comment.objects.filter(is_hidden=True), chunk_size
+            )
+        ),
+        'reviews': (
+            _delete_in_chunks(
+                Review.objects.filter(title__in=hidden_titles), chunk_size
+            )
+            + _delete_in_chunks(
+                Review.objects.filter(author__in=hidden_users), chunk_size
+            )
+            + _delete_in_chunks(
+                Review.objects.filter(is_hidden=True), chunk_size
+            )
+        ),
+    }
+    stats['titles'] = _purge_rows(hidden_titles, delete_titles, chunk_size)
+    stats['users'] = _purge_rows(hidden_users, delete_users, chunk_size)
+    fragments.bump(Title, title_ids)
+    return stats
+
+
+def _purge_rows(queryset, delete_func, chunk_size):
+    """Удаление самих скрытых строк порциями через быстрый каскад."""
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        delete_func(pks)
+        deleted += len(pks)
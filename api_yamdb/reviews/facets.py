@@ -0,0 +1,38 @@
+"""Версия каталога для кеша фасетных счётчиков произведений.
+
+Счётчики по жанрам, категориям и годам зависят только от произведений,
+их жанров и категорий. Токен версии входит в ключ кеша счётчиков и
+меняется при записи в эти таблицы, поэтому после изменения каталога
+счётчики считаются заново, не дожидаясь истечения TTL. Отзывы и
+просмотры на счётчики не влияют и версию не меняют.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import Category, Genre, GenreTitle, Title
+
+VERSION_KEY = 'facets:version'
+
+
+def catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is not None:
+        return version
+    cache.add(VERSION_KEY, uuid.uuid4().hex[:12], None)
+    return cache.get(VERSION_KEY)
+
+
+def invalidate(**kwargs):
+    """Новая версия: закешированные счётчики больше не используются."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex[:12], None)
+
+
+for model in (Title, GenreTitle, Genre, Category):
+    post_save.connect(invalidate, sender=model,
+                      dispatch_uid=f'facets:{model.__name__}:save')
+    post_delete.connect(invalidate, sender=model,
+                        dispatch_uid=f'facets:{model.__name__}:delete')
+m2m_changed.connect(invalidate, sender=Title.genre.through,
+                    dispatch_uid='facets:genre:m2m')
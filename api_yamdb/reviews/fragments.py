@@ -0,0 +1,161 @@
+"""Версии объектов для кеша сериализованных фрагментов.
+
+У каждого произведения, отзыва и комментария в общем кеше хранится
+токен версии, а у модели целиком - токен поколения. Оба входят в ключ
+фрагмента, поэтому запись в объект или в то, от чего зависит его
+представление, делает недоступными ровно устаревшие фрагменты.
+Версии меняются после коммита записи: иначе параллельный запрос успел
+бы закешировать старое представление под новой версией.
+"""
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+
+from .models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+def _token():
+    return uuid.uuid4().hex[:12]
+
+
+def _generation_key(model):
+    return f'fragver:{model._meta.label_lower}'
+
+
+def _version_key(model, pk):
+    return f'fragver:{model._meta.label_lower}:{pk}'
+
+
+def bump(model, pks):
+    """Новая версия для объектов модели с указанными pk после коммита."""
+    keys = [_version_key(model, pk) for pk in pks]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(
+            {key: _token() for key in keys}, None
+        ))
+
+
+def invalidate_all(*models):
+    """Новое поколение после коммита: фрагменты моделей устаревают разом."""
+    keys = [_generation_key(model) for model in models]
+    transaction.on_commit(lambda: cache.set_many(
+        {key: _token() for key in keys}, None
+    ))
+
+
+def fragment_keys(model, pks):
+    """Ключи фрагментов объектов с их текущими версиями."""
+    keys = [_generation_key(model)] + [_version_key(model, pk) for pk in pks]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, _token(), None)
+        versions.update(cache.get_many(missing))
+    label = model._meta.label_lower
+    generation = versions[keys[0]]
+    return {
+        pk: f'fragment:{label}:{generation}:{pk}:{versions[key]}'
+        for pk, key in zip(pks, keys[1:])
+    }
+
+
+def get_fragments(model, pks):
+    """Ключи фрагментов и словарь найденных в кеше фрагментов по pk."""
+    keys = fragment_keys(model, pks)
+    cached = cache.get_many(list(keys.values()))
+    found = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    return keys, found
+
+
+def set_fragments(keys, fragments):
+    """Сохранение фрагментов по pk под ключами из get_fragments."""
+    cache.set_many(
+        {keys[pk]: data for pk, data in fragments.items()},
+        settings.FRAGMENT_CACHE_TIMEOUT
+    )
+
+
+def title_saved(instance, **kwargs):
+    bump(Title, [instance.pk])
+    bump(Review, instance.reviews.values_list('pk', flat=True))
+
+
+def title_deleted(instance, **kwargs):
+    bump(Title, [instance.pk])
+
+
+def title_genres_changed(instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        bump(Title, pk_set or [])
+    else:
+        bump(Title, [instance.pk])
+
+
+def genre_title_changed(instance, **kwargs):
+    bump(Title, [instance.title_id])
+
+
+def review_changed(instance, **kwargs):
+    bump(Review, [instance.pk])
+    bump(Title, [instance.title_id])
+
+
+def comment_changed(instance, **kwargs):
+    bump(Comment, [instance.pk])
+
+
+def user_saving(instance, update_fields=None, **kwargs):
+    """Отметка смены username: только он входит во фрагменты."""
+    instance._username_changed = (
+        instance.pk is not None
+        and (update_fields is None or 'username' in update_fields)
+        and User.objects.filter(pk=instance.pk).exclude(
+            username=instance.username
+        ).exists()
+    )
+
+
+def user_saved(instance, created, **kwargs):
+    if created or not getattr(instance, '_username_changed', False):
+        return
+    bump(Review, instance.reviews.values_list('pk', flat=True))
+    bump(Comment, instance.comments.values_list('pk', flat=True))
+
+
+def genre_changed(instance, **kwargs):
+    bump(Title, Title.objects.filter(
+        genres__genre_id=instance.pk
+    ).values_list('pk', flat=True))
+
+
+def category_changed(instance, **kwargs):
+    bump(Title, Title.objects.filter(
+        category_id=instance.pk
+    ).values_list('pk', flat=True))
+
+
+post_save.connect(title_saved, sender=Title)
+post_delete.connect(title_deleted, sender=Title)
+m2m_changed.connect(title_genres_changed, sender=Title.genre.through)
+post_save.connect(genre_title_changed, sender=Title.genre.through)
+post_delete.connect(genre_title_changed, sender=Title.genre.through)
+post_save.connect(review_changed, sender=Review)
+post_delete.connect(review_changed, sender=Review)
+post_save.connect(comment_changed, sender=Comment)
+post_delete.connect(comment_changed, sender=Comment)
+pre_save.connect(user_saving, sender=User)
+post_save.connect(user_saved, sender=User)
+post_save.connect(genre_changed, sender=Genre)
+pre_delete.connect(genre_changed, sender=Genre)
+post_save.connect(category_changed, sender=Category)
+pre_delete.connect(category_changed, sender=Category)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from reviews.similarity import COSINE, METHODS, build_similar_titles
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт похожих произведений по совместным оценкам'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--method',
+            choices=METHODS,
+            default=COSINE,
+            help='cosine или adjusted (оценки за вычетом средней автора)'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Сколько похожих произведений хранить для каждого'
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=512,
+            help='Количество строк матрицы, обрабатываемых за один проход'
+        )
+
+    def handle(self, *args, **kwargs):
+        saved = build_similar_titles(
+            kwargs['method'], kwargs['top_k'], kwargs['block_size']
+        )
+        self.stdout.write(f'Сохранено похожих произведений: {saved}')
@@ -1,11 +1,22 @@
 import csv
+import hashlib
+import json
 import logging
 import os
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from reviews import facets
+from reviews.bulk import raw_dates, reset_sequence
+from reviews.deletion import delete_titles, delete_users
+from reviews.fragments import invalidate_all
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.taxonomy import category_cache, genre_cache
 
 User = get_user_model()
 
@@ -114,19 +125,153 @@ name_func = {
 }
 
 
+# Колонки csv по порядку и соответствующие им атрибуты моделей.
+sync_specs = {
+    'category.csv': (Category, ('id', 'name', 'slug')),
+    'genre.csv': (Genre, ('id', 'name', 'slug')),
+    'titles.csv': (Title, ('id', 'name', 'year', 'category_id')),
+    'genre_title.csv': (GenreTitle, ('id', 'title_id', 'genre_id')),
+    'users.csv': (User, ('id', 'username', 'email', 'role', 'bio',
+                         'first_name', 'last_name')),
+    'review.csv': (Review, ('id', 'title_id', 'text', 'author_id',
+                            'score', 'pub_date')),
+    'comments.csv': (Comment, ('id', 'review_id', 'text', 'author_id',
+                               'pub_date')),
+}
+
+# Удаление с быстрым каскадом для моделей с большим числом потомков.
+sync_deleters = {
+    Title: delete_titles,
+    User: delete_users,
+}
+
+
+def to_python_row(model, attnames, row):
+    """Значения строки csv в тех же типах, что отдаёт БД."""
+    values = []
+    for attname, raw in zip(attnames, row):
+        field = model._meta.get_field(attname)
+        if raw == '' and field.null:
+            values.append(None)
+        else:
+            values.append(field.to_python(raw))
+    return tuple(values)
+
+
+def encode_value(value):
+    """Значения вне JSON: даты в ISO, время с поясом - в UTC."""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc)
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def row_digest(values):
+    """Хеш значений строки, не зависящий от процесса и пояса."""
+    return hashlib.blake2b(
+        json.dumps(values, default=encode_value).encode(), digest_size=16
+    ).digest()
+
+
+def sync_rows(model, attnames, incoming_data, delete, batch_size):
+    """Идемпотентная синхронизация таблицы со снимком csv.
+
+    В памяти держится только хеш содержимого каждой существующей
+    строки, он сравнивается с хешем входящей, и в БД уходят только
+    вставки, изменения и удаления пачками по batch_size. Возвращает
+    счётчики изменений.
+    """
+    existing = {
+        values[0]: row_digest(values)
+        for values in model.objects.values_list(*attnames).iterator()
+    }
+    to_create, to_update, seen = [], [], set()
+    for row in incoming_data[1:]:
+        values = to_python_row(model, attnames, row)
+        pk = values[0]
+        seen.add(pk)
+        old_digest = existing.get(pk)
+        if old_digest == row_digest(values):
+            continue
+        obj = model(**dict(zip(attnames, values)))
+        if old_digest is None:
+            to_create.append(obj)
+        else:
+            to_update.append(obj)
+    to_delete = [pk for pk in existing if pk not in seen] if delete else []
+
+    with transaction.atomic(), raw_dates(model):
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+        model.objects.bulk_update(
+            to_update, attnames[1:], batch_size=batch_size
+        )
+        deleter = sync_deleters.get(model)
+        for start in range(0, len(to_delete), batch_size):
+            chunk = to_delete[start:start + batch_size]
+            if deleter is not None:
+                deleter(chunk)
+            else:
+                model.objects.filter(pk__in=chunk).delete()
+        if to_create:
+            reset_sequence(model)
+    invalidate_all(Title, Review, Comment)
+    facets.invalidate()
+    genre_cache.invalidate()
+    category_cache.invalidate()
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(to_delete),
+        'unchanged': len(seen) - len(to_create) - len(to_update),
+    }
+
+
 class Command(BaseCommand):
     help = 'Импорт данных из csv файлов'
+    # Команда для cron: системные проверки (в том числе импорт URLconf
+    # со всеми вьюсетами) ей не нужны.
+    requires_system_checks = []
 
     def add_arguments(self, parser):
         parser.add_argument(
             'name',
             help='Введите название файла для импорта'
         )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Применить только изменения относительно данных в БД'
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='При --sync удалить строки, которых нет в файле'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки для массовых запросов при --sync'
+        )
 
     def handle(self, *args, **kwargs):
         name = kwargs['name']
         path = os.path.join(settings.CSV_FILES_DIR, name)
         file_data = read_csv(path)
+        if kwargs['sync']:
+            if name not in sync_specs or file_data is None:
+                raise CommandError(f'Нельзя синхронизировать {name}')
+            model, attnames = sync_specs[name]
+            stats = sync_rows(model, attnames, file_data,
+                              kwargs['delete'], kwargs['batch_size'])
+            self.stdout.write(
+                '{name}: добавлено {created}, изменено {updated}, '
+                'удалено {deleted}, без изменений {unchanged}'.format(
+                    name=name, **stats
+                )
+            )
+            return
         for func, func_name in name_func.items():
             if name == func:
                 func_name(file_data)
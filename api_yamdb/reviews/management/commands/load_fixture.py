@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import tempfile
+import time
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews import facets
+from reviews.bulk import raw_dates, reset_sequence
+from reviews.fragments import invalidate_all
+from reviews.models import Comment, Review, Title
+from reviews.taxonomy import category_cache, genre_cache
+
+# Порядок загрузки по зависимостям внешних ключей. Прочие модели
+# загружаются следом в порядке появления в файле.
+DEPENDENCY_ORDER = (
+    'users.user',
+    'reviews.category',
+    'reviews.genre',
+    'reviews.title',
+    'reviews.genretitle',
+    'reviews.review',
+    'reviews.comment',
+)
+
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_fixture(stream, chunk_size):
+    """Объекты JSON-массива по одному, без чтения файла целиком."""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip()
+    if not buffer:
+        return
+    if not buffer.startswith('['):
+        raise CommandError('Фикстура должна быть JSON-массивом')
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        buffer = buffer[SEPARATORS.match(buffer).end():]
+        if buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise CommandError('Фикстура повреждена или обрезана')
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield obj
+        buffer = buffer[end:]
+
+
+def split_by_model(path, tmp_dir, chunk_size):
+    """Раскладка объектов по временным NDJSON-файлам моделей."""
+    files = {}
+    with open(path, encoding='utf-8') as stream:
+        for obj in iter_fixture(stream, chunk_size):
+            label = obj['model'].lower()
+            if label not in files:
+                files[label] = open(
+                    os.path.join(tmp_dir, f'{label}.ndjson'), 'w+',
+                    encoding='utf-8'
+                )
+            files[label].write(json.dumps(obj, ensure_ascii=False) + '\n')
+    for file in files.values():
+        file.seek(0)
+    return files
+
+
+def iter_batches(file, batch_size):
+    batch = []
+    for line in file:
+        batch.append(json.loads(line))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def save_batch(model, batch):
+    """Вставка пачки одним bulk_create вместе со связями many-to-many."""
+    deserialized = list(serializers.deserialize('python', batch))
+    with raw_dates(model):
+        model.objects.bulk_create([item.object for item in deserialized])
+    for item in deserialized:
+        for field_name, values in (item.m2m_data or {}).items():
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            through.objects.bulk_create([
+                through(**{f'{source}_id': item.object.pk,
+                           f'{target}_id': value})
+                for value in values
+            ])
+
+
+class Command(BaseCommand):
+    help = 'Потоковая загрузка большой JSON-фикстуры пачками bulk_create'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к JSON-фикстуре')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество объектов в одном bulk_create'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1 << 16,
+            help='Размер блока чтения файла в символах'
+        )
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        total = 0
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = split_by_model(kwargs['path'], tmp_dir,
+                                   kwargs['chunk_size'])
+            labels = [label for label in DEPENDENCY_ORDER if label in files]
+            labels += [label for label in files if label not in labels]
+            with transaction.atomic():
+                for label in labels:
+                    total += self.load_model(
+                        label, files[label], kwargs['batch_size']
+                    )
+            for file in files.values():
+                file.close()
+        genre_cache.invalidate()
+        category_cache.invalidate()
+        invalidate_all(Title, Review, Comment)
+        facets.invalidate()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Всего загружено {total} объектов за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} объектов/с)'
+        )
+
+    def load_model(self, label, file, batch_size):
+        model = apps.get_model(label)
+        started = time.monotonic()
+        count = 0
+        for batch in iter_batches(file, batch_size):
+            save_batch(model, batch)
+            count += len(batch)
+        reset_sequence(model)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{label}: {count} объектов за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-6):.0f} объектов/с)'
+        )
+        return count
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from reviews.changes import purge_changes
+
+
+class Command(BaseCommand):
+    help = 'Удаление записей журнала изменений старше срока хранения'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Количество строк, удаляемых за одну транзакцию'
+        )
+
+    def handle(self, *args, **kwargs):
+        deleted = purge_changes(kwargs['chunk_size'])
+        self.stdout.write(f'changes: удалено {deleted}')
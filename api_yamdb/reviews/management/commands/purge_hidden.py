@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from reviews.deletion import purge_hidden
+
+
+class Command(BaseCommand):
+    help = 'Фоновая очистка скрытых произведений и пользователей'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество строк, удаляемых за одну транзакцию'
+        )
+
+    def handle(self, *args, **kwargs):
+        stats = purge_hidden(kwargs['chunk_size'])
+        for name, count in stats.items():
+            self.stdout.write(f'{name}: удалено {count}')
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_auto_20230402_1822'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='произведение скрыто и ожидает фоновой очистки', verbose_name='скрыто до удаления'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:57
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_is_hidden'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='title_name_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_name_upper_idx'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together=set(),
+        ),
+    ]
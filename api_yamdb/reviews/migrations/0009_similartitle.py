@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_remove_review_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarTitle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_titles', to='reviews.title')),
+            ],
+            options={
+                'ordering': ('rank',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='similartitle',
+            constraint=models.UniqueConstraint(fields=('title', 'rank'), name='unique_similar_title_rank'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='комментарий скрыт модератором и ожидает фоновой очистки', verbose_name='скрыто до удаления'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='отзыв скрыт модератором и ожидает фоновой очистки', verbose_name='скрыто до удаления'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_review_comment_is_hidden'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='views',
+            field=models.PositiveBigIntegerField(default=0, help_text='число просмотров страницы произведения', verbose_name='просмотры'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-views'], name='title_views_idx'),
+        ),
+    ]
@@ -0,0 +1,152 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:18
+
+from django.db import migrations, models
+
+# Таблица, модель в журнале, колонка с id объекта, колонки, изменение
+# которых считается изменением объекта, и действие, если оно всегда одно.
+TRACKED = (
+    ('reviews_title', 'title', 'id',
+     ('name', 'year', 'description', 'category_id', 'is_hidden'), None),
+    ('reviews_genre', 'genre', 'id', ('name', 'slug'), None),
+    ('reviews_category', 'category', 'id', ('name', 'slug'), None),
+    ('reviews_review', 'review', 'id',
+     ('title_id', 'author_id', 'text', 'score', 'pub_date', 'is_hidden'),
+     None),
+    ('reviews_comment', 'comment', 'id',
+     ('review_id', 'author_id', 'text', 'pub_date', 'is_hidden'), None),
+    ('reviews_genretitle', 'title', 'title_id', ('title_id', 'genre_id'),
+     'update'),
+)
+
+HIDEABLE = ('reviews_title', 'reviews_review', 'reviews_comment')
+
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION reviews_log_change() RETURNS trigger AS $$
+DECLARE
+    data jsonb;
+    change_action varchar(6);
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        data := to_jsonb(OLD);
+        change_action := 'delete';
+    ELSE
+        data := to_jsonb(NEW);
+        change_action := CASE WHEN TG_OP = 'INSERT'
+            THEN 'create' ELSE 'update' END;
+        IF (data ->> 'is_hidden')::boolean THEN
+            change_action := 'delete';
+        END IF;
+    END IF;
+    IF TG_NARGS > 2 THEN
+        change_action := TG_ARGV[2];
+    END IF;
+    -- clock_timestamp(), а не now(): now() - время начала транзакции,
+    -- и запись долгой транзакции выглядела бы старше окна ожидания
+    -- коммитов (CHANGE_FEED_SETTLE_SECONDS), хотя её id ещё не виден читателям.
+    INSERT INTO reviews_change (model, object_id, action, created)
+    VALUES (TG_ARGV[0], (data ->> TG_ARGV[1])::bigint, change_action,
+            clock_timestamp());
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def postgres_triggers(table, model, id_column, columns, action):
+    args = f"'{model}', '{id_column}'" + (f", '{action}'" if action else '')
+    old = ', '.join(f'OLD.{column}' for column in columns)
+    new = ', '.join(f'NEW.{column}' for column in columns)
+    return [
+        f'CREATE TRIGGER {table}_change_insert AFTER INSERT ON {table} '
+        f'FOR EACH ROW EXECUTE PROCEDURE reviews_log_change({args})',
+        f'CREATE TRIGGER {table}_change_delete AFTER DELETE ON {table} '
+        f'FOR EACH ROW EXECUTE PROCEDURE reviews_log_change({args})',
+        f'CREATE TRIGGER {table}_change_update AFTER UPDATE ON {table} '
+        f'FOR EACH ROW WHEN (({old}) IS DISTINCT FROM ({new})) '
+        f'EXECUTE PROCEDURE reviews_log_change({args})',
+    ]
+
+
+def sqlite_triggers(table, model, id_column, columns, action):
+    def insert_change(row, change_action):
+        return (
+            'BEGIN INSERT INTO reviews_change '
+            '(model, object_id, action, created) '
+            f"VALUES ('{model}', {row}.{id_column}, {change_action}, "
+            'CURRENT_TIMESTAMP); END'
+        )
+
+    if action:
+        created = updated = deleted = f"'{action}'"
+    elif table in HIDEABLE:
+        created = "CASE WHEN NEW.is_hidden THEN 'delete' ELSE 'create' END"
+        updated = "CASE WHEN NEW.is_hidden THEN 'delete' ELSE 'update' END"
+        deleted = "'delete'"
+    else:
+        created, updated, deleted = "'create'", "'update'", "'delete'"
+    changed = ' OR '.join(
+        f'OLD.{column} IS NOT NEW.{column}' for column in columns
+    )
+    return [
+        f'CREATE TRIGGER {table}_change_insert AFTER INSERT ON {table} '
+        + insert_change('NEW', created),
+        f'CREATE TRIGGER {table}_change_delete AFTER DELETE ON {table} '
+        + insert_change('OLD', deleted),
+        f'CREATE TRIGGER {table}_change_update AFTER UPDATE ON {table} '
+        f'WHEN {changed} ' + insert_change('NEW', updated),
+    ]
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+        build = postgres_triggers
+    elif vendor == 'sqlite':
+        build = sqlite_triggers
+    else:
+        return
+    for spec in TRACKED:
+        for sql in build(*spec):
+            schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    for table, *_ in TRACKED:
+        for operation in ('insert', 'delete', 'update'):
+            on_table = f' ON {table}' if vendor == 'postgresql' else ''
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS {table}_change_{operation}'
+                f'{on_table}', params=None
+            )
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP FUNCTION IF EXISTS reviews_log_change()', params=None
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'создание'), ('update', 'изменение'), ('delete', 'удаление')], max_length=6)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Рейтинг входит в представление произведения, поэтому отзыв, меняющий
+# его, дополнительно пишет в журнал изменение произведения.
+TABLE = 'reviews_review'
+CHANGED = ('title_id', 'score', 'is_hidden')
+
+
+def insert_change(row):
+    return (
+        'BEGIN INSERT INTO reviews_change '
+        '(model, object_id, action, created) '
+        f"VALUES ('title', {row}.title_id, 'update', CURRENT_TIMESTAMP); END"
+    )
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        procedure = (
+            "EXECUTE PROCEDURE reviews_log_change('title', 'title_id', "
+            "'update')"
+        )
+        old = ', '.join(f'OLD.{column}' for column in CHANGED)
+        new = ', '.join(f'NEW.{column}' for column in CHANGED)
+        statements = [
+            f'CREATE TRIGGER {TABLE}_rating_insert AFTER INSERT ON {TABLE} '
+            f'FOR EACH ROW {procedure}',
+            f'CREATE TRIGGER {TABLE}_rating_delete AFTER DELETE ON {TABLE} '
+            f'FOR EACH ROW {procedure}',
+            f'CREATE TRIGGER {TABLE}_rating_update AFTER UPDATE ON {TABLE} '
+            f'FOR EACH ROW WHEN (({old}) IS DISTINCT FROM ({new})) '
+            f'{procedure}',
+        ]
+    elif vendor == 'sqlite':
+        changed = ' OR '.join(
+            f'OLD.{column} IS NOT NEW.{column}' for column in CHANGED
+        )
+        statements = [
+            f'CREATE TRIGGER {TABLE}_rating_insert AFTER INSERT ON {TABLE} '
+            + insert_change('NEW'),
+            f'CREATE TRIGGER {TABLE}_rating_delete AFTER DELETE ON {TABLE} '
+            + insert_change('OLD'),
+            f'CREATE TRIGGER {TABLE}_rating_update AFTER UPDATE ON {TABLE} '
+            f'WHEN {changed} ' + insert_change('NEW'),
+        ]
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return
+    on_table = f' ON {TABLE}' if vendor == 'postgresql' else ''
+    for operation in ('insert', 'delete', 'update'):
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS {TABLE}_rating_{operation}{on_table}',
+            params=None
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,155 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:04
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+initial = import_module('reviews.migrations.0013_change')
+review_rating = import_module('reviews.migrations.0014_change_review_rating')
+
+# В Postgres запись журнала помечается номером транзакции: лента
+# отдаёт строки только завершённых транзакций (см. reviews.changes).
+POSTGRES_FUNCTION = initial.POSTGRES_FUNCTION.replace(
+    'INSERT INTO reviews_change (model, object_id, action, created)',
+    'INSERT INTO reviews_change (model, object_id, action, created, txid)'
+).replace(
+    'clock_timestamp());', 'clock_timestamp(), txid_current());'
+)
+
+# Изменение рейтинга пишется одной строкой на произведение за оператор,
+# а не на каждую строку отзыва: триггер уровня оператора читает
+# переходные таблицы (Postgres 10+).
+POSTGRES_RATING_FUNCTION = """
+CREATE OR REPLACE FUNCTION reviews_log_rating_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO reviews_change (model, object_id, action, created, txid)
+        SELECT 'title', title_id, 'update', clock_timestamp(), txid_current()
+        FROM (SELECT DISTINCT title_id FROM new_rows ORDER BY title_id) t;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO reviews_change (model, object_id, action, created, txid)
+        SELECT 'title', title_id, 'update', clock_timestamp(), txid_current()
+        FROM (SELECT DISTINCT title_id FROM old_rows ORDER BY title_id) t;
+    ELSE
+        INSERT INTO reviews_change (model, object_id, action, created, txid)
+        SELECT 'title', title_id, 'update', clock_timestamp(), txid_current()
+        FROM (
+            SELECT DISTINCT moved.title_id
+            FROM old_rows o JOIN new_rows n ON n.id = o.id,
+                LATERAL (VALUES (o.title_id), (n.title_id)) moved(title_id)
+            WHERE (o.title_id, o.score, o.is_hidden)
+                IS DISTINCT FROM (n.title_id, n.score, n.is_hidden)
+            ORDER BY moved.title_id
+        ) t;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+TABLE = review_rating.TABLE
+
+
+def sqlite_insert_change(row):
+    """Строка произведения, если за эту секунду её ещё нет.
+
+    CURRENT_TIMESTAMP одинаков в пределах оператора, поэтому массовое
+    удаление отзывов пишет одну строку на произведение. Окно ожидания
+    коммитов больше секунды, и такую строку читатели ещё не получили.
+    """
+    return (
+        'BEGIN INSERT INTO reviews_change '
+        '(model, object_id, action, created) '
+        f"SELECT 'title', {row}.title_id, 'update', CURRENT_TIMESTAMP "
+        'WHERE NOT EXISTS (SELECT 1 FROM reviews_change '
+        f"WHERE model = 'title' AND object_id = {row}.title_id "
+        "AND action = 'update' AND created = CURRENT_TIMESTAMP); END"
+    )
+
+
+def drop_sqlite_triggers(apps, schema_editor):
+    """SQLite пересоздаёт таблицу при AddField, а триггеры ссылаются на неё."""
+    if schema_editor.connection.vendor == 'sqlite':
+        initial.drop_triggers(apps, schema_editor)
+        review_rating.drop_triggers(apps, schema_editor)
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        initial.create_triggers(apps, schema_editor)
+        review_rating.create_triggers(apps, schema_editor)
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+        schema_editor.execute(
+            'UPDATE reviews_change SET txid = 0 WHERE txid IS NULL',
+            params=None
+        )
+        schema_editor.execute(POSTGRES_RATING_FUNCTION, params=None)
+        procedure = (
+            'FOR EACH STATEMENT EXECUTE PROCEDURE reviews_log_rating_change()'
+        )
+        statements = [
+            f'CREATE TRIGGER {TABLE}_rating_insert AFTER INSERT ON {TABLE} '
+            f'REFERENCING NEW TABLE AS new_rows {procedure}',
+            f'CREATE TRIGGER {TABLE}_rating_delete AFTER DELETE ON {TABLE} '
+            f'REFERENCING OLD TABLE AS old_rows {procedure}',
+            f'CREATE TRIGGER {TABLE}_rating_update AFTER UPDATE ON {TABLE} '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            f'{procedure}',
+        ]
+    elif vendor == 'sqlite':
+        initial.create_triggers(apps, schema_editor)
+        changed = ' OR '.join(
+            f'OLD.{column} IS NOT NEW.{column}'
+            for column in review_rating.CHANGED
+        )
+        statements = [
+            f'CREATE TRIGGER {TABLE}_rating_insert AFTER INSERT ON {TABLE} '
+            + sqlite_insert_change('NEW'),
+            f'CREATE TRIGGER {TABLE}_rating_delete AFTER DELETE ON {TABLE} '
+            + sqlite_insert_change('OLD'),
+            f'CREATE TRIGGER {TABLE}_rating_update AFTER UPDATE ON {TABLE} '
+            f'WHEN {changed} ' + sqlite_insert_change('NEW'),
+        ]
+    else:
+        return
+    review_rating.drop_triggers(apps, schema_editor)
+    for sql in statements:
+        schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        drop_sqlite_triggers(apps, schema_editor)
+        return
+    review_rating.drop_triggers(apps, schema_editor)
+    schema_editor.execute(
+        'DROP FUNCTION IF EXISTS reviews_log_rating_change()', params=None
+    )
+    schema_editor.execute(initial.POSTGRES_FUNCTION, params=None)
+    review_rating.create_triggers(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_change_review_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_sqlite_triggers, restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='change',
+            name='txid',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['txid', 'id'], name='change_txid_idx'),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
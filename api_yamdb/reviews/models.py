@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 from .validators import validate_year
 
@@ -79,6 +80,24 @@ class Title(models.Model):
         verbose_name='тип произведения',
         help_text='введите тип произведения'
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='скрыто до удаления',
+        help_text='произведение скрыто и ожидает фоновой очистки'
+    )
+    views = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='просмотры',
+        help_text='число просмотров страницы произведения'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(Upper('name'), name='title_name_upper_idx'),
+            models.Index(fields=('year', ), name='title_year_idx'),
+            models.Index(fields=('-views', ), name='title_views_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -97,6 +116,12 @@ class GenreTitle(models.Model):
         related_name='titles'
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=('genre', 'title'),
+                         name='genretitle_genre_title_idx'),
+        ]
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -107,10 +132,15 @@ class Review(models.Model):
     score = models.PositiveIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(10)])
     pub_date = models.DateTimeField(auto_now_add=True)
+    is_hidden = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='скрыто до удаления',
+        help_text='отзыв скрыт модератором и ожидает фоновой очистки'
+    )
 
     class Meta:
         ordering = ("-pub_date", )
-        unique_together = ('title', 'author')
         constraints = [
             models.UniqueConstraint(
                 fields=["author", "title"], name="unique_review"
@@ -128,9 +158,71 @@ class Comment(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField(auto_now_add=True)
+    is_hidden = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='скрыто до удаления',
+        help_text='комментарий скрыт модератором и ожидает фоновой очистки'
+    )
 
     class Meta:
         ordering = ("-pub_date", )
 
     def __str__(self):
         return self.text[:15]
+
+
+class SimilarTitle(models.Model):
+    """Предрассчитанные похожие произведения по совместным оценкам."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles'
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ('rank', )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'rank'], name='unique_similar_title_rank'
+            )
+        ]
+
+
+class Change(models.Model):
+    """Запись журнала изменений каталога для зеркалирующих клиентов.
+
+    Строки пишут триггеры БД в той же транзакции, что и само изменение
+    (см. миграцию 0013_change), поэтому в журнал попадают и множественные
+    UPDATE/DELETE без сигналов Django. В Postgres txid — номер
+    транзакции, записавшей строку: по нему лента отдаёт только
+    завершённые транзакции (см. reviews.changes).
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = (
+        (CREATE, 'создание'),
+        (UPDATE, 'изменение'),
+        (DELETE, 'удаление'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    txid = models.BigIntegerField(null=True)
+
+    class Meta:
+        ordering = ('id', )
+        indexes = [
+            models.Index(fields=('txid', 'id'), name='change_txid_idx'),
+        ]
@@ -0,0 +1,100 @@
+"""Похожие произведения по совместным оценкам пользователей.
+
+Оценки из reviews_review собираются в разреженную матрицу
+произведение × пользователь, строки нормируются, и косинусная близость
+считается умножением матриц блоками по block_size строк: в памяти
+одновременно только один блок результата. Для каждого произведения
+сохраняются top_k самых близких в таблицу SimilarTitle.
+"""
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from .models import Review, SimilarTitle
+
+COSINE = 'cosine'
+ADJUSTED_COSINE = 'adjusted'
+METHODS = (COSINE, ADJUSTED_COSINE)
+
+
+def visible_reviews():
+    """Отзывы, участвующие в расчёте: без скрытых отзывов, произведений
+    и авторов."""
+    return Review.objects.filter(
+        is_hidden=False, title__is_hidden=False, author__is_hidden=False
+    )
+
+
+def load_scores():
+    """Массив строк (title_id, author_id, score) видимых отзывов."""
+    rows = visible_reviews().values_list(
+        'title_id', 'author_id', 'score'
+    ).order_by()
+    data = np.fromiter(
+        chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.int64
+    )
+    return data.reshape(-1, 3)
+
+
+def score_matrix(data, method):
+    """Нормированная матрица оценок и id произведений по её строкам."""
+    title_ids, rows = np.unique(data[:, 0], return_inverse=True)
+    user_ids, columns = np.unique(data[:, 1], return_inverse=True)
+    scores = data[:, 2].astype(np.float64)
+    if method == ADJUSTED_COSINE:
+        means = (np.bincount(columns, weights=scores)
+                 / np.bincount(columns))
+        scores -= means[columns]
+    matrix = sparse.csr_matrix(
+        (scores, (rows, columns)), shape=(len(title_ids), len(user_ids))
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix, title_ids
+
+
+def top_similar(block, offset, top_k):
+    """Top-K ненулевых по близости столбцов для каждой строки блока."""
+    for index in range(block.shape[0]):
+        start, end = block.indptr[index], block.indptr[index + 1]
+        columns = block.indices[start:end]
+        values = block.data[start:end]
+        keep = (columns != offset + index) & (values > 0)
+        columns, values = columns[keep], values[keep]
+        if len(values) > top_k:
+            best = np.argpartition(-values, top_k - 1)[:top_k]
+            columns, values = columns[best], values[best]
+        order = np.argsort(-values, kind='stable')
+        yield index, columns[order], values[order]
+
+
+def build_similar_titles(method=COSINE, top_k=20, block_size=512):
+    """Пересчёт таблицы SimilarTitle, возвращает число сохранённых строк."""
+    data = load_scores()
+    saved = 0
+    if len(data):
+        matrix, title_ids = score_matrix(data, method)
+        title_ids = title_ids.tolist()
+        transposed = matrix.T.tocsr()
+        for offset in range(0, matrix.shape[0], block_size):
+            block = (matrix[offset:offset + block_size] @ transposed).tocsr()
+            block.sort_indices()
+            objs = [
+                SimilarTitle(title_id=title_ids[offset + index],
+                             similar_id=title_ids[column],
+                             score=float(score), rank=rank)
+                for index, columns, scores in top_similar(block, offset,
+                                                          top_k)
+                for rank, (column, score) in enumerate(zip(columns, scores))
+            ]
+            block_ids = title_ids[offset:offset + block_size]
+            with transaction.atomic():
+                SimilarTitle.objects.filter(title_id__in=block_ids).delete()
+                SimilarTitle.objects.bulk_create(objs)
+            saved += len(objs)
+    SimilarTitle.objects.exclude(
+        title_id__in=visible_reviews().values('title_id')
+    ).delete()
+    return saved
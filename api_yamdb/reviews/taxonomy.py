@@ -0,0 +1,65 @@
+"""In-process кеш маленьких справочников: жанров и категорий.
+
+Каждый процесс держит свою копию таблицы и сверяет её с номером версии
+в общем кеше Django. Любая запись в справочник меняет версию, и все
+воркеры перечитывают таблицу одним запросом при следующем обращении.
+Версия меняется после коммита записи: иначе другой воркер успел бы
+перечитать ещё старые строки под новой версией.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Category, Genre
+
+
+class TaxonomyCache:
+    """Версионируемая копия справочника в памяти процесса."""
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'taxonomy:{model._meta.label_lower}:version'
+        self._state = (None, (), {})
+
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            return cache.get(self.version_key)
+        return version
+
+    def _load(self):
+        version = self._shared_version()
+        if version is None or version != self._state[0]:
+            objects = tuple(self.model.objects.order_by('pk'))
+            by_slug = {obj.slug: obj for obj in objects}
+            self._state = (version, objects, by_slug)
+        return self._state
+
+    def all(self):
+        """Все записи справочника в порядке первичного ключа."""
+        return self._load()[1]
+
+    def get_by_slug(self, slug):
+        """Запись по слагу или None."""
+        return self._load()[2].get(slug)
+
+    def invalidate(self, **kwargs):
+        """Новая версия: все процессы перечитают справочник."""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self._state = (None, (), {})
+
+    def invalidate_on_commit(self, **kwargs):
+        transaction.on_commit(self.invalidate)
+
+
+genre_cache = TaxonomyCache(Genre)
+category_cache = TaxonomyCache(Category)
+
+for model, taxonomy in ((Genre, genre_cache), (Category, category_cache)):
+    post_save.connect(taxonomy.invalidate_on_commit, sender=model,
+                      weak=False)
+    post_delete.connect(taxonomy.invalidate_on_commit, sender=model,
+                        weak=False)
@@ -1,11 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
+from reviews.deletion import FastDeleteAdminMixin, remove_users
+from reviews.paginators import EstimatedCountPaginator
 
 User = get_user_model()
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(FastDeleteAdminMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'username',
@@ -13,9 +15,14 @@ class UserAdmin(admin.ModelAdmin):
         'first_name',
         'last_name',
         'bio',
-        'role'
+        'role',
+        'is_hidden'
     )
-    search_fields = ('username',)
+    list_filter = ('is_hidden',)
+    remove_func = staticmethod(remove_users)
+    search_fields = ('=username', '=email')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_editable = ('role',)
     list_display_links = ('username',)
     empty_value_display = '-пусто-'
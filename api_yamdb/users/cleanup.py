@@ -0,0 +1,67 @@
+"""Очистка неподтверждённых регистраций.
+
+Регистрация считается подтверждённой, когда за код выдан токен:
+TokenViewSet ставит last_login и стирает confirmation_code. Остальные
+записи старше UNCONFIRMED_SIGNUP_MAX_AGE_DAYS удаляет команда
+purge_signups (её можно запускать из cron).
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from reviews.models import Comment, Review
+
+from .models import USER
+
+User = get_user_model()
+
+
+def unconfirmed_signups(max_age):
+    """Пользователи, запросившие код, но так и не получившие токен.
+
+    Подтверждение отмечается last_login при выдаче токена. Аккаунты
+    с отзывами, комментариями или особой ролью не трогаются.
+    """
+    return User.objects.filter(
+        last_login__isnull=True,
+        confirmation_code__isnull=False,
+        date_joined__lt=timezone.now() - max_age,
+        role=USER,
+        is_staff=False,
+        is_superuser=False,
+    ).exclude(
+        Exists(Review.objects.filter(author=OuterRef('pk')))
+    ).exclude(
+        Exists(Comment.objects.filter(author=OuterRef('pk')))
+    )
+
+
+def purge_unconfirmed_signups(max_age, chunk_size):
+    """Удаление неподтверждённых регистраций и использованных кодов.
+
+    Каждая порция удаляется в своей короткой транзакции. Строки,
+    заблокированные параллельной выдачей токена, пропускаются до
+    следующего запуска. Возвращает словарь с количеством строк.
+    """
+    stats = {'users': 0, 'codes': 0}
+    candidates = unconfirmed_signups(max_age).order_by()
+    while True:
+        with transaction.atomic():
+            pks = list(candidates.select_for_update(
+                skip_locked=True
+            ).values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+            stats['users'] += User.objects.filter(pk__in=pks).delete()[1].get(
+                User._meta.label, 0
+            )
+    used_codes = User.objects.filter(
+        last_login__isnull=False, confirmation_code__isnull=False
+    ).order_by()
+    while True:
+        pks = list(used_codes.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return stats
+        stats['codes'] += User.objects.filter(
+            pk__in=pks, last_login__isnull=False
+        ).update(confirmation_code=None)
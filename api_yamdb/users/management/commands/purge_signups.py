@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.cleanup import purge_unconfirmed_signups, unconfirmed_signups
+
+
+class Command(BaseCommand):
+    help = ('Удаление неподтверждённых регистраций и использованных '
+            'кодов подтверждения (можно запускать из cron)')
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-days',
+            type=float,
+            default=settings.UNCONFIRMED_SIGNUP_MAX_AGE_DAYS,
+            help='Возраст неподтверждённой регистрации для удаления, дней'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Количество строк, удаляемых за одну транзакцию'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать регистрации, которые будут удалены'
+        )
+
+    def handle(self, *args, **kwargs):
+        max_age = timedelta(days=kwargs['max_age_days'])
+        if kwargs['dry_run']:
+            count = unconfirmed_signups(max_age).count()
+            self.stdout.write(f'users: к удалению {count}')
+            return
+        stats = purge_unconfirmed_signups(max_age, kwargs['chunk_size'])
+        self.stdout.write(f'users: удалено {stats["users"]}')
+        self.stdout.write(f'codes: очищено {stats["codes"]}')
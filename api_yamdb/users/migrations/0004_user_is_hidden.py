@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='Пользователь скрыт и ожидает фоновой очистки', verbose_name='Скрыт до удаления'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(blank=True, choices=[('user', 'user'), ('admin', 'admin'), ('moderator', 'moderator')], default='user', max_length=20, verbose_name='роль'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Индексы для users.search, только в Postgres. Таблица большая, поэтому
+# индексы строятся CONCURRENTLY вне транзакции.
+INDEXES = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS user_username_prefix_idx '
+    'ON users_user ((UPPER(username) COLLATE "C"))',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS user_username_trgm_idx '
+    'ON users_user USING gin (UPPER(username) gin_trgm_ops)',
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm',
+                          params=None)
+    for sql in INDEXES:
+        schema_editor.execute(sql, params=None)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in ('user_username_prefix_idx', 'user_username_trgm_idx'):
+        schema_editor.execute(
+            f'DROP INDEX CONCURRENTLY IF EXISTS {name}', params=None
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_user_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
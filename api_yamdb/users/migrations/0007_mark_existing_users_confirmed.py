@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models import F
+
+
+def mark_confirmed(apps, schema_editor):
+    # Подтверждение отмечается last_login при выдаче токена. Раньше его
+    # не записывали, поэтому все существующие аккаунты считаются
+    # подтверждёнными, и purge_signups удалит только новые регистрации.
+    User = apps.get_model('users', 'User')
+    User.objects.filter(last_login__isnull=True).update(
+        last_login=F('date_joined')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_username_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_confirmed, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 USER = 'user'
 ADMIN = 'admin'
@@ -56,11 +57,23 @@ class User(AbstractUser):
         default=USER,
         blank=True
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='Скрыт до удаления',
+        help_text='Пользователь скрыт и ожидает фоновой очистки'
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Upper('username'), name='user_username_upper_idx'),
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+        ]
 
     @property
     def is_admin(self):
-        return self.role == self.Roles.ADMIN or self.is_staff
+        return self.role == ADMIN or self.is_staff
 
     @property
     def is_moderator(self):
-        return self.role == self.Roles.MODERATOR
+        return self.role == MODERATOR
@@ -0,0 +1,45 @@
+"""Поиск пользователей по началу или части имени.
+
+В Postgres префиксный поиск фильтрует и сортирует по выражению
+UPPER(username) COLLATE "C", по которому построен btree-индекс
+user_username_prefix_idx: LIKE 'AB%' превращается в диапазон индекса,
+а ORDER BY с LIMIT читает из него только первые строки без сортировки.
+Поиск по части имени идёт по триграммному GIN-индексу
+user_username_trgm_idx (pg_trgm) на UPPER(username). В других СУБД
+используются обычные istartswith и icontains.
+"""
+from django.db import connections
+from django.db.models.functions import Collate, Upper
+
+PREFIX = 'prefix'
+INFIX = 'infix'
+SEARCH_MODES = (PREFIX, INFIX)
+
+# Триграммный индекс бесполезен для строк короче трёх символов.
+INFIX_MIN_LENGTH = 3
+
+
+class UsernameKey(Collate):
+    """UPPER(username) COLLATE "C" — выражение индекса префиксов.
+
+    Скобки нужны потому, что лукапы Postgres дописывают к выражению ::text.
+    """
+    template = '(%(expressions)s %(function)s %(collation)s)'
+
+    def __init__(self):
+        super().__init__(Upper('username'), 'C')
+
+
+def search_usernames(users, query, mode=PREFIX):
+    """Пользователи queryset, чьё имя начинается с query или содержит его."""
+    if connections[users.db].vendor != 'postgresql':
+        lookup = 'icontains' if mode == INFIX else 'istartswith'
+        return users.filter(**{f'username__{lookup}': query}).order_by(
+            Upper('username')
+        )
+    users = users.alias(username_key=UsernameKey())
+    if mode == INFIX:
+        users = users.filter(username__icontains=query)
+    else:
+        users = users.filter(username_key__startswith=query.upper())
+    return users.order_by('username_key')
@@ -0,0 +1,88 @@
+"""Накладные расходы middleware и согласования контента на запрос к API.
+
+Один и тот же лёгкий GET (/api/v1/categories/ из in-process кеша
+справочника) прогоняется через обработчик Django со стандартными
+middleware сессий, CSRF, аутентификации и сообщений и полным набором
+рендереров DRF («до») и с middleware из api.middleware и только
+JSONRenderer («после»). Для сравнения замеряется запрос к странице
+входа в админку, для которой middleware работают как раньше.
+
+    python benchmarks/api_middleware.py --requests 2000
+"""
+import argparse
+from contextlib import contextmanager
+
+from dataset import best_time, setup_django, test_database
+
+STOCK_MIDDLEWARE = {
+    'api.middleware.SessionMiddleware':
+        'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.CsrfViewMiddleware':
+        'django.middleware.csrf.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware':
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.MessageMiddleware':
+        'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+@contextmanager
+def stock_setup():
+    """«До»: стандартные middleware и рендереры DRF по умолчанию.
+
+    renderer_classes читается из настроек при импорте APIView, поэтому
+    рендереры подменяются на самом классе.
+    """
+    from django.conf import settings
+    from django.test import override_settings
+    from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+    from rest_framework.views import APIView
+
+    renderers = APIView.renderer_classes
+    APIView.renderer_classes = [JSONRenderer, BrowsableAPIRenderer]
+    try:
+        with override_settings(MIDDLEWARE=[
+            STOCK_MIDDLEWARE.get(path, path) for path in settings.MIDDLEWARE
+        ]):
+            yield
+    finally:
+        APIView.renderer_classes = renderers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    setup_django()
+
+    from django.test import Client
+    from reviews.models import Category
+
+    def per_request_us(path):
+        client = Client(HTTP_ACCEPT='application/json')
+        assert client.get(path).status_code in (200, 302)
+
+        def run():
+            for _ in range(options.requests):
+                client.get(path)
+
+        return best_time(run, options.repeat) * 1000 / options.requests
+
+    with test_database():
+        Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(10)
+        )
+        print(f'{"запрос":<22}{"до, мкс":>10}{"после, мкс":>12}'
+              f'{"экономия, мкс":>15}')
+        for path in ('/api/v1/categories/', '/admin/login/'):
+            with stock_setup():
+                before = per_request_us(path)
+            after = per_request_us(path)
+            print(f'{path:<22}{before:>10.1f}{after:>12.1f}'
+                  f'{before - after:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
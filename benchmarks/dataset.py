@@ -0,0 +1,101 @@
+"""Общая часть бенчмарков на синтетических данных.
+
+Бенчмарки создают отдельную тестовую базу (как manage.py test),
+заполняют её bulk_create и удаляют после замеров, рабочие данные
+не затрагиваются.
+"""
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_dataset(titles, users, reviews_per_title, genres=20,
+                   categories=10, comments_per_review=0, seed=0):
+    """Синтетический каталог заданного размера."""
+    from django.contrib.auth import get_user_model
+    from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                                Title)
+
+    rng = random.Random(seed)
+    batch_size = 5000
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(genres)
+    )
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    genre_ids = list(Genre.objects.values_list('pk', flat=True))
+    get_user_model().objects.bulk_create(
+        (get_user_model()(username=f'user{i}', email=f'user{i}@example.com')
+         for i in range(users)),
+        batch_size=batch_size
+    )
+    user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    Title.objects.bulk_create(
+        (Title(name=f'Произведение {i}', year=rng.randint(1900, 2022),
+               description='описание', category_id=rng.choice(category_ids))
+         for i in range(titles)),
+        batch_size=batch_size
+    )
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    GenreTitle.objects.bulk_create(
+        (GenreTitle(title_id=title_id, genre_id=genre_id)
+         for title_id in title_ids
+         for genre_id in rng.sample(genre_ids, rng.randint(1, 3))),
+        batch_size=batch_size
+    )
+    Review.objects.bulk_create(
+        (Review(title_id=title_id, author_id=author_id, text='отзыв',
+                score=rng.randint(1, 10))
+         for title_id in title_ids
+         for author_id in rng.sample(
+             user_ids, min(reviews_per_title, len(user_ids)))),
+        batch_size=batch_size
+    )
+    if comments_per_review:
+        review_ids = Review.objects.values_list('pk', flat=True).iterator()
+        Comment.objects.bulk_create(
+            (Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                     text='комментарий')
+             for review_id in review_ids
+             for _ in range(comments_per_review)),
+            batch_size=batch_size
+        )
+
+
+def best_time(func, repeat):
+    """Лучшее время вызова func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
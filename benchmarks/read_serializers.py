@@ -0,0 +1,79 @@
+"""Списки: сериализаторы DRF против чтения через values().
+
+Для страницы из --page-size произведений, отзывов и комментариев
+сравниваются ModelSerializer (с select_related/prefetch_related, как
+в лучшем случае для списка) и ValuesReader из api.v1.readers.
+Печатаются лучшее время страницы, время на строку, сэкономленное на
+строку время и совпадение результатов.
+
+    python benchmarks/read_serializers.py --page-size 1000
+"""
+import argparse
+
+from dataset import best_time, create_dataset, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--reviews-per-title', type=int, default=3)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    setup_django()
+
+    from api.v1.readers import comment_reader, review_reader, title_reader
+    from api.v1.serializers import (CommentSerializer, ReadTitleSerializer,
+                                    ReviewSerializer)
+    from api.v1.title_json import TITLE_RATING, ordered_genres
+    from rest_framework.renderers import JSONRenderer
+    from reviews.models import Comment, Review, Title
+
+    with test_database():
+        create_dataset(options.titles, options.users,
+                       options.reviews_per_title, comments_per_review=1)
+        size = options.page_size
+        scenarios = (
+            ('произведения', title_reader, ReadTitleSerializer,
+             Title.objects.annotate(rating=TITLE_RATING).order_by('pk'),
+             ('category',), (ordered_genres(),)),
+            ('отзывы', review_reader, ReviewSerializer,
+             Review.objects.order_by('pk'), ('title', 'author'), ()),
+            ('комментарии', comment_reader, CommentSerializer,
+             Comment.objects.order_by('pk'), ('author',), ()),
+        )
+        renderer = JSONRenderer()
+        print(f'{"список":<14}{"строк":>7}{"DRF, мс":>10}{"values, мс":>12}'
+              f'{"DRF, мкс/стр":>14}{"values, мкс/стр":>17}'
+              f'{"экономия, мкс/стр":>19}  совпадают')
+        for name, reader, serializer_class, queryset, related, prefetch in (
+            scenarios
+        ):
+            pks = list(queryset.values_list('pk', flat=True)[:size])
+            page = queryset.filter(pk__in=pks)
+            serialized = page.select_related(*related).prefetch_related(
+                *prefetch
+            )
+
+            def serialize():
+                return serializer_class(serialized.all(), many=True).data
+
+            def read():
+                return reader.read(page.all())
+
+            same = renderer.render(serialize()) == renderer.render(
+                list(read().values())
+            )
+            drf_ms = best_time(serialize, options.repeat)
+            values_ms = best_time(read, options.repeat)
+            rows = len(pks) or 1
+            print(f'{name:<14}{len(pks):>7}{drf_ms:>10.1f}{values_ms:>12.1f}'
+                  f'{drf_ms * 1000 / rows:>14.1f}'
+                  f'{values_ms * 1000 / rows:>17.1f}'
+                  f'{(drf_ms - values_ms) * 1000 / rows:>19.1f}  '
+                  f'{"да" if same else "нет"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Время холодного старта wsgi.py, asgi.py и команд manage.py.
+
+Каждая точка входа запускается в отдельном процессе с -X importtime.
+manage.py check проходит системные проверки, как runserver и migrate,
+а import с несуществующим файлом - путь команды для cron без работы
+с данными.
+Скрипт печатает лучшее время из нескольких запусков и пакеты с
+наибольшим суммарным временем импорта. С --budget-ms завершается
+с кодом 1, если хотя бы одна точка входа не укладывается в бюджет
+(для CI).
+
+    python benchmarks/startup.py --budget-ms 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+
+TARGETS = {
+    'wsgi.py': ['-c', 'import api_yamdb.wsgi'],
+    'asgi.py': ['-c', 'import api_yamdb.asgi'],
+    'manage.py check': ['manage.py', 'check'],
+    'manage.py import': ['manage.py', 'import', 'startup-benchmark.csv'],
+}
+
+
+def run(args, importtime):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    started = time.perf_counter()
+    result = subprocess.run(
+        command + args, cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'}
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        sys.exit(f'{" ".join(args)} завершился с ошибкой:\n{result.stderr}')
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr):
+    """Строки importtime: (собственное, накопленное время в мкс, модуль)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def report(name, args, repeat, top):
+    best = min(run(args, importtime=False)[0] for _ in range(repeat))
+    rows = parse_importtime(run(args, importtime=True)[1])
+    print(f'{name}: {best:.0f} мс, модулей импортировано: {len(rows)}')
+    packages = {}
+    for self_us, _, module in rows:
+        package = module.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    for package, self_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f'  {self_us / 1000:8.1f} мс  {package}')
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float)
+    options = parser.parse_args()
+    over_budget = []
+    for name, args in TARGETS.items():
+        best = report(name, args, options.repeat, options.top)
+        if options.budget_ms is not None and best > options.budget_ms:
+            over_budget.append(name)
+    if over_budget:
+        sys.exit(f'Превышен бюджет {options.budget_ms:.0f} мс: '
+                 f'{", ".join(over_budget)}')
+
+
+if __name__ == '__main__':
+    main()
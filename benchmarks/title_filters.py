@@ -0,0 +1,78 @@
+"""Фильтрация произведений: JOIN по жанрам против подзапросов.
+
+Для каждого сценария сравниваются фильтр через genre__slug (JOIN с
+GenreTitle, как было раньше) и TitlesFilter (IN/EXISTS). Печатаются
+лучшее время, число строк и совпадение рейтингов. JOIN размножает
+строки отзывов до группировки, подзапросы группируют только отзывы.
+
+    python benchmarks/title_filters.py --titles 50000
+"""
+import argparse
+
+from dataset import best_time, create_dataset, setup_django, test_database
+
+SCENARIOS = (
+    ('один жанр', {'genre': 'genre-1'}),
+    ('любой из трёх жанров', {'genre': 'genre-1,genre-2,genre-3'}),
+    ('все из двух жанров', {'genre': 'genre-1,genre-2',
+                            'genre_mode': 'all'}),
+    ('годы и две категории', {'year_min': '1990', 'year_max': '2000',
+                              'category': 'category-1,category-2'}),
+)
+
+
+def join_queryset(base, params):
+    """Прежний способ: фильтры по связанным полям через JOIN."""
+    from django.db.models import Count
+
+    lookups = {}
+    if 'category' in params:
+        lookups['category__slug__in'] = params['category'].split(',')
+    if 'year_min' in params:
+        lookups['year__gte'] = params['year_min']
+        lookups['year__lte'] = params['year_max']
+    if 'genre' not in params:
+        return base.filter(**lookups)
+    slugs = params['genre'].split(',')
+    queryset = base.filter(genre__slug__in=slugs, **lookups)
+    if params.get('genre_mode') != 'all':
+        return queryset
+    return queryset.annotate(
+        matched=Count('genre', distinct=True)
+    ).filter(matched=len(slugs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--reviews-per-title', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    setup_django()
+
+    from api.v1.filters import TitlesFilter
+    from django.db.models import Avg
+    from reviews.models import Title
+
+    with test_database():
+        create_dataset(options.titles, options.users,
+                       options.reviews_per_title)
+        base = Title.objects.annotate(rating=Avg('reviews__score'))
+        print(f'{"сценарий":<24}{"JOIN, мс":>10}{"строк":>8}'
+              f'{"подзапрос, мс":>15}{"строк":>8}  совпадают')
+        for name, params in SCENARIOS:
+            joined = join_queryset(base, params)
+            filtered = TitlesFilter(params, queryset=base).qs
+            join_rows = dict(joined.values_list('pk', 'rating'))
+            filter_rows = dict(filtered.values_list('pk', 'rating'))
+            join_ms = best_time(lambda: list(joined.all()), options.repeat)
+            filter_ms = best_time(lambda: list(filtered.all()),
+                                  options.repeat)
+            print(f'{name:<24}{join_ms:>10.1f}{len(join_rows):>8}'
+                  f'{filter_ms:>15.1f}{len(filter_rows):>8}  '
+                  f'{"да" if join_rows == filter_rows else "нет"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,98 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """Тестовая БД: без DB_ENGINE в окружении - SQLite в памяти.
+
+    Так тесты с БД запускаются и без сервера Postgres. В CI отдельный
+    job задаёт DB_ENGINE и гоняет их на Postgres.
+    """
+    if 'DB_ENGINE' in os.environ:
+        return
+    from django.db import connections
+
+    # Копия настроек, чтобы settings.DATABASES осталась как есть.
+    connections.settings = {
+        **connections.settings,
+        'default': {
+            **connections.settings['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    del connections['default']
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш не переносится между тестами: id объектов повторяются."""
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture
+def catalog(db):
+    """Произведения в двух категориях с отзывами всех пользователей.
+
+    У каждого отзыва по комментарию первого пользователя.
+    """
+    from types import SimpleNamespace
+
+    from django.contrib.auth import get_user_model
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    User = get_user_model()
+    users = [
+        User.objects.create(username=f'user{i}', email=f'user{i}@example.com')
+        for i in range(3)
+    ]
+    admin = User.objects.create(username='admin', email='admin@example.com',
+                                role='admin')
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = []
+    for i in range(4):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=1990 + i * 10,
+            category=movie if i % 2 else book
+        )
+        title.genre.set([drama] if i % 2 else [drama, comedy])
+        titles.append(title)
+        for j, user in enumerate(users):
+            review = Review.objects.create(title=title, author=user,
+                                           text='отзыв', score=i + j + 1)
+            Comment.objects.create(review=review, author=users[0],
+                                   text='комментарий')
+    return SimpleNamespace(admin=admin, users=users, titles=titles,
+                           categories=[movie, book], genres=[drama, comedy])
+
+
+@pytest.fixture
+def api_client():
+    from rest_framework.test import APIClient
+
+    return APIClient()
+
+
+@pytest.fixture
+def admin_client(catalog):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(catalog.admin)
+    return client
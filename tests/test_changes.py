@@ -0,0 +1,166 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+
+    @pytest.fixture
+    def client(self, catalog, api_client):
+        api_client.force_authenticate(catalog.users[0])
+        return api_client
+
+    def settle(self):
+        """Записи журнала старше окна ожидания коммитов."""
+        from datetime import timedelta
+
+        from django.db.models import F
+        from reviews.models import Change
+
+        Change.objects.update(created=F('created') - timedelta(minutes=1))
+
+    def feed(self, client, since, **params):
+        response = client.get('/api/v1/changes/', {'since': since, **params})
+        assert response.status_code == 200
+        data = response.json()
+        data['results'] = [(item['model'], item['object_id'], item['action'])
+                           for item in data['results']]
+        return data
+
+    def head(self, client):
+        self.settle()
+        return client.get('/api/v1/changes/').json()['cursor']
+
+    def test_pages_follow_cursor(self, catalog, client):
+        from reviews.models import Title
+
+        cursor = self.head(client)
+        titles = [Title.objects.create(name=f'Новое {i}', year=2000)
+                  for i in range(3)]
+        self.settle()
+        first = self.feed(client, cursor, limit=2)
+        assert first['results'] == [('title', titles[0].pk, 'create'),
+                                    ('title', titles[1].pk, 'create')]
+        assert first['has_more'] is True
+        rest = self.feed(client, first['cursor'], limit=2)
+        assert rest['results'] == [('title', titles[2].pk, 'create')]
+        assert rest['has_more'] is False
+        assert self.feed(client, rest['cursor'])['results'] == []
+
+    def test_actions(self, catalog, client):
+        from reviews.deletion import delete_titles, hide_titles
+        from reviews.models import Title
+
+        first, second, third = catalog.titles[:3]
+        cursor = self.head(client)
+        Title.objects.filter(pk=first.pk).update(views=10)
+        Title.objects.filter(pk=first.pk).update(name='Новое название')
+        hide_titles([second.pk])
+        delete_titles([third.pk])
+        self.settle()
+        changes = self.feed(client, cursor)['results']
+        assert ('title', first.pk, 'update') in changes
+        assert len([change for change in changes
+                    if change[:2] == ('title', first.pk)]) == 1, (
+            'Изменение просмотров не попадает в журнал'
+        )
+        assert ('title', second.pk, 'delete') in changes, (
+            'Скрытие отдаётся клиентам как удаление'
+        )
+        assert ('title', third.pk, 'delete') in changes
+
+    def test_unsettled_changes_wait(self, catalog, client):
+        from reviews.models import Genre
+
+        cursor = self.head(client)
+        genre = Genre.objects.create(name='Мюзикл', slug='musical')
+        data = self.feed(client, cursor)
+        assert data['results'] == [], (
+            'Записи моложе окна ожидания коммитов не отдаются'
+        )
+        self.settle()
+        assert self.feed(client, data['cursor'])['results'] == [
+            ('genre', genre.pk, 'create')
+        ]
+
+    def test_bulk_review_delete_logs_title_once(self, catalog, client):
+        from reviews.models import Review
+
+        title = catalog.titles[0]
+        cursor = self.head(client)
+        deleted = Review.objects.filter(title=title).values_list(
+            'pk', flat=True
+        )
+        review_ids = set(deleted)
+        Review.objects.filter(title=title).delete()
+        self.settle()
+        changes = self.feed(client, cursor)['results']
+        assert {change[1] for change in changes
+                if change[0] == 'review'} == review_ids
+        assert changes.count(('title', title.pk, 'update')) == 1, (
+            'Массовое удаление отзывов пишет одну строку на произведение'
+        )
+
+    def test_invalid_and_expired_cursors(self, catalog, client, settings):
+        from django.core import signing
+        from reviews.changes import CURSOR_SALT
+
+        cursor = self.head(client)
+        assert client.get(
+            '/api/v1/changes/', {'since': 'чужой курсор'}
+        ).status_code == 400
+        legacy = signing.dumps(1, salt=CURSOR_SALT)
+        assert client.get(
+            '/api/v1/changes/', {'since': legacy}
+        ).status_code == 410, 'Курсор по одному id требует полной синхронизации'
+        settings.CHANGE_LOG_RETENTION_DAYS = 0
+        assert client.get(
+            '/api/v1/changes/', {'since': cursor}
+        ).status_code == 410
+
+    def test_purge_changes(self, catalog, settings):
+        from io import StringIO
+
+        from django.core.management import call_command
+        from reviews.models import Change
+
+        self.settle()
+        settings.CHANGE_LOG_RETENTION_DAYS = 0
+        total = Change.objects.count()
+        out = StringIO()
+        call_command('purge_changes', '--chunk-size', '7', stdout=out)
+        assert out.getvalue() == f'changes: удалено {total}\n'
+        assert not Change.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestChangeFeedTransactions:
+
+    def test_open_transaction_holds_later_commits(self):
+        from django.db import connection
+        from reviews.changes import changes_since, head_cursor, read_cursor
+        from reviews.models import Genre
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('txid транзакций есть только в Postgres')
+        since = read_cursor(head_cursor())
+        other = connection.get_new_connection(
+            connection.get_connection_params()
+        )
+        try:
+            with other.cursor() as cursor:
+                cursor.execute(
+                    'INSERT INTO reviews_genre (name, slug) '
+                    "VALUES ('Долгий', 'long') RETURNING id"
+                )
+                long_id = cursor.fetchone()[0]
+            later = Genre.objects.create(name='Поздний', slug='later')
+            changes, _, _ = changes_since(since, 10)
+            assert changes == [], (
+                'Коммит после начала открытой транзакции ждёт её завершения'
+            )
+            other.commit()
+        finally:
+            other.close()
+        changes, _, _ = changes_since(since, 10)
+        assert [change.object_id for change in changes] == [long_id,
+                                                            later.pk]
@@ -0,0 +1,100 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestViewCounter:
+
+    @pytest.fixture(autouse=True)
+    def counter(self, settings):
+        from reviews.counters import title_views
+
+        settings.VIEW_COUNTS_FLUSH_INTERVAL = 3600
+        settings.VIEW_COUNTS_FLUSH_THRESHOLD = 5
+        title_views.pending.clear()
+        title_views.hits = 0
+        yield title_views
+        title_views.pending.clear()
+        title_views.hits = 0
+
+    def views(self, catalog):
+        from reviews.models import Title
+
+        return list(Title.objects.filter(
+            pk__in=[title.pk for title in catalog.titles]
+        ).order_by('pk').values_list('views', flat=True))
+
+    def test_views_are_flushed_in_one_update(
+        self, catalog, api_client, counter
+    ):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        first, second = catalog.titles[:2]
+        for _ in range(3):
+            api_client.get(f'/api/v1/titles/{first.pk}/')
+        api_client.get(f'/api/v1/titles/{second.pk}/')
+        api_client.get('/api/v1/titles/1000000/')
+        assert self.views(catalog) == [0, 0, 0, 0], (
+            'До порога просмотры копятся в памяти'
+        )
+        assert counter.pending == {first.pk: 3, second.pk: 1}
+
+        with CaptureQueriesContext(connection) as context:
+            api_client.get(f'/api/v1/titles/{second.pk}/')
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+        assert self.views(catalog) == [3, 2, 0, 0]
+        assert not counter.pending
+        assert api_client.get(
+            f'/api/v1/titles/{first.pk}/'
+        ).json()['views'] == 3, 'Сброс обновляет фрагмент произведения'
+
+    def test_failed_flush_keeps_views(
+        self, catalog, api_client, counter, monkeypatch
+    ):
+        from django.db import DatabaseError
+        from reviews import counters
+
+        def fail(deltas):
+            raise DatabaseError
+
+        title = catalog.titles[0]
+        counter.hit(title.pk)
+        monkeypatch.setattr(counters, 'add_views', fail)
+        counter.flush()
+        assert counter.pending == {title.pk: 1}, (
+            'Просмотры не теряются, если сброс не удался'
+        )
+        monkeypatch.undo()
+        counter.flush()
+        assert self.views(catalog)[0] == 1
+
+    def test_flusher_thread_is_started_once(self, catalog, counter):
+        import os
+        import threading
+
+        counter.hit(catalog.titles[0].pk)
+        counter.hit(catalog.titles[1].pk)
+        assert counter.flusher_pid == os.getpid()
+        flushers = [thread for thread in threading.enumerate()
+                    if thread.name == 'title-views-flush']
+        assert len(flushers) == 1, 'Один фоновый поток сброса на процесс'
+        assert flushers[0].daemon
+
+    def test_worker_exit_flushes_views(self, catalog, counter):
+        import os
+        from importlib.util import module_from_spec, spec_from_file_location
+
+        from django.conf import settings
+
+        spec = spec_from_file_location(
+            'gunicorn_conf', os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+        )
+        config = module_from_spec(spec)
+        spec.loader.exec_module(config)
+        counter.hit(catalog.titles[0].pk)
+        config.worker_exit(None, None)
+        assert self.views(catalog)[0] == 1, (
+            'Просмотры сбрасываются при остановке воркера'
+        )
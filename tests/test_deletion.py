@@ -0,0 +1,103 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestDeletion:
+
+    def counts(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Comment, Review, Title
+
+        return (Title.objects.count(), get_user_model().objects.count(),
+                Review.objects.count(), Comment.objects.count())
+
+    def test_delete_title_cascades(self, catalog, admin_client):
+        response = admin_client.delete(
+            f'/api/v1/titles/{catalog.titles[0].pk}/'
+        )
+        assert response.status_code == 204
+        assert self.counts() == (3, 4, 9, 9), (
+            'С произведением удаляются его отзывы и комментарии к ним'
+        )
+
+    def test_delete_user_cascades(self, catalog, admin_client):
+        response = admin_client.delete(
+            f'/api/v1/users/{catalog.users[0].username}/'
+        )
+        assert response.status_code == 204
+        # Первый пользователь комментировал все отзывы.
+        assert self.counts() == (4, 3, 8, 0)
+
+    def test_delete_user_updates_rating(self, catalog, admin_client):
+        title = catalog.titles[0]
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/'
+        ).json()['rating'] == 2
+        admin_client.delete(f'/api/v1/users/{catalog.users[2].username}/')
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/'
+        ).json()['rating'] == 1, (
+            'Рейтинг в кеше фрагментов должен обновиться после удаления'
+        )
+
+    def test_deferred_delete_hides_then_purges(
+        self, catalog, admin_client, settings
+    ):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        settings.DEFERRED_DELETE = True
+        title = catalog.titles[1]
+        assert admin_client.delete(
+            f'/api/v1/titles/{title.pk}/'
+        ).status_code == 204
+        assert admin_client.delete(
+            f'/api/v1/users/{catalog.users[1].username}/'
+        ).status_code == 204
+        assert self.counts() == (4, 4, 12, 12), 'Строки пока только скрыты'
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/'
+        ).status_code == 404
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/'
+        ).status_code == 404
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 3
+
+        out = StringIO()
+        call_command('purge_hidden', '--chunk-size', '2', stdout=out)
+        assert self.counts() == (3, 3, 6, 6)
+        assert 'titles: удалено 1' in out.getvalue()
+        assert 'users: удалено 1' in out.getvalue()
+
+    def test_hidden_users_leave_lists_and_rating(
+        self, catalog, admin_client, settings
+    ):
+        settings.DEFERRED_DELETE = True
+        title = catalog.titles[0]
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/'
+        ).json()['rating'] == 2
+        assert admin_client.get(reviews_url).json()['count'] == 3
+        admin_client.delete(f'/api/v1/users/{catalog.users[2].username}/')
+        reviews = admin_client.get(reviews_url).json()['results']
+        assert catalog.users[2].username not in {
+            review['author'] for review in reviews
+        }, 'Отзывы скрытого пользователя не видны до фоновой очистки'
+        assert admin_client.get(
+            f'/api/v1/titles/{title.pk}/'
+        ).json()['rating'] == 1, 'И не входят в рейтинг'
+
+        comments_urls = {
+            review['author']: f"{reviews_url}{review['id']}/comments/"
+            for review in reviews
+        }
+        kept_url = comments_urls[catalog.users[1].username]
+        hidden_url = comments_urls[catalog.users[0].username]
+        assert admin_client.get(kept_url).json()['count'] == 1
+        admin_client.delete(f'/api/v1/users/{catalog.users[0].username}/')
+        assert admin_client.get(kept_url).json()['results'] == [], (
+            'Комментарии скрытого пользователя не видны'
+        )
+        assert admin_client.get(hidden_url).status_code == 404
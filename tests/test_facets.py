@@ -0,0 +1,75 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+
+    url = '/api/v1/titles/facets/'
+
+    def counts(self, items):
+        return {item['slug']: item['count'] for item in items}
+
+    def test_counts_for_filter(self, catalog, api_client):
+        data = api_client.get(self.url).json()
+        assert data['count'] == 4
+        assert self.counts(data['genre']) == {'drama': 4, 'comedy': 2}
+        assert self.counts(data['category']) == {'movie': 2, 'book': 2}
+        assert data['year'] == [
+            {'from': year, 'to': year + 9, 'count': 1}
+            for year in (1990, 2000, 2010, 2020)
+        ]
+
+        data = api_client.get(
+            self.url, {'category': 'movie', 'year_min': 2010}
+        ).json()
+        assert data['count'] == 1
+        assert self.counts(data['genre']) == {'drama': 1}
+        assert self.counts(data['category']) == {'movie': 1}
+
+    def test_cache_key_is_normalized(self, db):
+        from api.v1.facets import facets_cache_key
+        from django.http import QueryDict
+
+        key = facets_cache_key(QueryDict('genre=drama,comedy&year_min=2000'))
+        assert facets_cache_key(QueryDict(
+            'year_min=2000&genre=comedy, drama&genre_mode=any&offset=10'
+        )) == key, 'Порядок, пробелы и лишние параметры не меняют ключ'
+        assert facets_cache_key(QueryDict(
+            'genre=drama,comedy&year_min=2000&genre_mode=all'
+        )) != key
+
+    def test_cached_response(
+        self, catalog, api_client, django_assert_num_queries
+    ):
+        expected = api_client.get(self.url, {'category': 'movie'}).json()
+        with django_assert_num_queries(0):
+            assert api_client.get(
+                self.url, {'category': ' movie '}
+            ).json() == expected
+
+    def test_catalog_changes_refresh_counts(self, catalog, api_client):
+        from api.v1.facets import facets_cache_key
+        from django.http import QueryDict
+        from reviews.deletion import hide_titles
+        from reviews.models import Review
+
+        api_client.get(self.url)
+        catalog.titles[0].genre.set([])
+        assert self.counts(api_client.get(self.url).json()['genre']) == {
+            'drama': 3, 'comedy': 1
+        }
+        hide_titles([catalog.titles[1].pk])
+        assert api_client.get(self.url).json()['count'] == 3
+        key = facets_cache_key(QueryDict())
+        Review.objects.filter(title=catalog.titles[2]).delete()
+        assert facets_cache_key(QueryDict()) == key, (
+            'Отзывы не влияют на счётчики и не сбрасывают их кеш'
+        )
+
+    def test_invalid_filter(self, catalog, api_client):
+        assert api_client.get(
+            self.url, {'year_min': 'год'}
+        ).status_code == 400
+        assert api_client.get(
+            self.url, {'genre_mode': 'some'}
+        ).status_code == 400
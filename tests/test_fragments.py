@@ -0,0 +1,117 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFragments:
+
+    def get(self, client, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return response.json(), len(context)
+
+    def by_id(self, data, pk):
+        return next(item for item in data['results'] if item['id'] == pk)
+
+    def test_list_is_served_from_fragments(self, catalog, api_client):
+        first, cold = self.get(api_client, '/api/v1/titles/')
+        second, warm = self.get(api_client, '/api/v1/titles/')
+        assert first == second
+        assert warm < cold, (
+            'Повторный список должен собираться из кеша фрагментов'
+        )
+
+    def test_new_review_updates_title_rating(self, catalog, admin_client):
+        title = catalog.titles[0]
+        data, _ = self.get(admin_client, '/api/v1/titles/')
+        assert self.by_id(data, title.pk)['rating'] == 2
+        admin_client.post(f'/api/v1/titles/{title.pk}/reviews/',
+                          {'text': 'отзыв', 'score': 10}, format='json')
+        data, _ = self.get(admin_client, '/api/v1/titles/')
+        assert self.by_id(data, title.pk)['rating'] == 4
+
+    def test_title_rename_updates_reviews(self, catalog, admin_client):
+        title = catalog.titles[0]
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        self.get(admin_client, url)
+        admin_client.patch(f'/api/v1/titles/{title.pk}/',
+                           {'name': 'Новое название'}, format='json')
+        data, _ = self.get(admin_client, url)
+        assert {item['title'] for item in data['results']} == {
+            'Новое название'
+        }
+
+    def test_genre_rename_updates_titles(self, catalog, api_client):
+        drama = catalog.genres[0]
+        self.get(api_client, '/api/v1/titles/')
+        drama.name = 'Трагедия'
+        drama.save()
+        data, _ = self.get(api_client, '/api/v1/titles/')
+        assert all(
+            'Трагедия' in [genre['name'] for genre in item['genre']]
+            for item in data['results']
+        )
+
+    def test_username_change_updates_comments(self, catalog, api_client):
+        review = catalog.titles[0].reviews.first()
+        url = (f'/api/v1/titles/{catalog.titles[0].pk}/reviews/'
+               f'{review.pk}/comments/')
+        self.get(api_client, url)
+        user = catalog.users[0]
+        user.username = 'renamed'
+        user.save()
+        data, _ = self.get(api_client, url)
+        assert {item['author'] for item in data['results']} == {'renamed'}
+
+    def test_other_user_saves_keep_fragments(self, catalog):
+        from django.utils import timezone
+        from reviews import fragments
+        from reviews.models import Comment, Review
+
+        user = catalog.users[0]
+        review_ids = list(user.reviews.values_list('pk', flat=True))
+        comment_ids = list(user.comments.values_list('pk', flat=True))
+        before = (fragments.fragment_keys(Review, review_ids),
+                  fragments.fragment_keys(Comment, comment_ids))
+        user.last_login = timezone.now()
+        user.save(update_fields=('last_login',))
+        user.bio = 'о себе'
+        user.save()
+        assert (fragments.fragment_keys(Review, review_ids),
+                fragments.fragment_keys(Comment, comment_ids)) == before, (
+            'Фрагменты зависят только от username'
+        )
+
+    def test_versions_change_after_commit(self, catalog, api_client):
+        from django.db import transaction
+        from reviews import fragments
+        from reviews.models import Review, Title
+
+        title = catalog.titles[0]
+        keys = fragments.fragment_keys(Title, [title.pk])
+        with transaction.atomic():
+            Review.objects.create(title=title, author=catalog.admin,
+                                  text='отзыв', score=10)
+            # Параллельный запрос до коммита видит старый рейтинг и
+            # кеширует его под текущей, ещё не изменённой версией.
+            assert fragments.fragment_keys(Title, [title.pk]) == keys
+        assert fragments.fragment_keys(Title, [title.pk]) != keys
+        data, _ = self.get(api_client, '/api/v1/titles/')
+        assert self.by_id(data, title.pk)['rating'] == 4
+
+    def test_rolled_back_write_keeps_versions(self, catalog):
+        from django.db import transaction
+        from reviews import fragments
+        from reviews.models import Title
+
+        title = catalog.titles[0]
+        keys = fragments.fragment_keys(Title, [title.pk])
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                title.name = 'Новое название'
+                title.save()
+                raise RuntimeError
+        assert fragments.fragment_keys(Title, [title.pk]) == keys
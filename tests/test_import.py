@@ -0,0 +1,104 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestImportSync:
+
+    @pytest.fixture
+    def csv_dir(self, tmp_path, settings):
+        settings.CSV_FILES_DIR = str(tmp_path)
+        return tmp_path
+
+    def sync(self, name, *args):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('import', name, '--sync', *args, stdout=out)
+        return out.getvalue().strip()
+
+    def test_sync_applies_only_changes(self, csv_dir):
+        from reviews.models import Category
+
+        path = csv_dir / 'category.csv'
+        path.write_text('id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+                        encoding='utf-8')
+        assert self.sync('category.csv') == (
+            'category.csv: добавлено 2, изменено 0, удалено 0, '
+            'без изменений 0'
+        )
+        assert self.sync('category.csv') == (
+            'category.csv: добавлено 0, изменено 0, удалено 0, '
+            'без изменений 2'
+        ), 'Повторная синхронизация того же файла ничего не меняет'
+
+        path.write_text('id,name,slug\n1,Кино,movie\n3,Музыка,music\n',
+                        encoding='utf-8')
+        assert self.sync('category.csv') == (
+            'category.csv: добавлено 1, изменено 1, удалено 0, '
+            'без изменений 0'
+        )
+        assert Category.objects.count() == 3, 'Без --delete строки остаются'
+        assert self.sync('category.csv', '--delete') == (
+            'category.csv: добавлено 0, изменено 0, удалено 1, '
+            'без изменений 2'
+        )
+        assert dict(Category.objects.values_list('id', 'name')) == {
+            1: 'Кино', 3: 'Музыка'
+        }
+        # Последовательность id сдвинута за импортированные строки.
+        assert Category.objects.create(name='Игра', slug='game').pk > 3
+
+    def test_sync_refreshes_taxonomy_cache(self, csv_dir, api_client):
+        path = csv_dir / 'genre.csv'
+        path.write_text('id,name,slug\n1,Драма,drama\n', encoding='utf-8')
+        self.sync('genre.csv')
+        assert api_client.get('/api/v1/genres/').json()['results'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        path.write_text('id,name,slug\n1,Комедия,comedy\n', encoding='utf-8')
+        self.sync('genre.csv')
+        assert api_client.get('/api/v1/genres/').json()['results'] == [
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ], 'После --sync справочник должен читаться заново'
+
+    def test_sync_compares_datetimes_by_value(self, csv_dir, catalog):
+        from reviews.models import Review
+
+        review = Review.objects.order_by('pk').first()
+        (csv_dir / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            f'{review.pk},{review.title_id},{review.text},'
+            f'{review.author_id},{review.score},'
+            f'{review.pub_date.isoformat()}\n',
+            encoding='utf-8'
+        )
+        assert self.sync('review.csv').endswith(
+            'добавлено 0, изменено 0, удалено 0, без изменений 1'
+        )
+
+    def test_sync_rejects_unknown_file(self, csv_dir):
+        from django.core.management import CommandError
+
+        with pytest.raises(CommandError):
+            self.sync('unknown.csv')
+
+    def test_row_digest_is_stable(self):
+        from datetime import datetime, timedelta, timezone
+        from importlib import import_module
+
+        row_digest = import_module(
+            'reviews.management.commands.import'
+        ).row_digest
+
+        moment = datetime(2019, 9, 24, 21, 8, tzinfo=timezone.utc)
+        shifted = moment.astimezone(timezone(timedelta(hours=3)))
+        assert row_digest((1, 'отзыв', moment)) == row_digest(
+            (1, 'отзыв', shifted)
+        ), 'Один момент времени в разных поясах даёт один хеш'
+        assert row_digest((1, 'отзыв', None)) != row_digest(
+            (1, 'отзыв', 'None')
+        )
+        assert row_digest((1, 'a', 'b')) != row_digest((1, 'a,b', ''))
+        assert len(row_digest((1, 'отзыв', moment))) == 16
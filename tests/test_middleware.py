@@ -0,0 +1,59 @@
+import pytest
+
+
+class TestAPIMiddleware:
+
+    @pytest.mark.parametrize('path, expected', (
+        ('/api/v1/titles/', False),
+        ('/admin/login/', True),
+    ))
+    def test_session_and_user_only_outside_api(self, path, expected):
+        from api.middleware import AuthenticationMiddleware, SessionMiddleware
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        seen = {}
+
+        def view(request):
+            seen['session'] = hasattr(request, 'session')
+            seen['user'] = hasattr(request, 'user')
+            return HttpResponse()
+
+        handler = SessionMiddleware(AuthenticationMiddleware(view))
+        handler(RequestFactory().get(path))
+        assert seen == {'session': expected, 'user': expected}
+
+    @pytest.mark.django_db
+    def test_admin_keeps_csrf(self):
+        from django.test import Client
+
+        client = Client(enforce_csrf_checks=True)
+        assert client.get('/admin/login/').status_code == 200
+        assert 'csrftoken' in client.cookies
+        assert client.post('/admin/login/', {
+            'username': 'admin', 'password': 'password'
+        }).status_code == 403, 'Форма админки без CSRF-токена отклоняется'
+
+    @pytest.mark.django_db
+    def test_api_skips_session_and_csrf(self):
+        from django.test import Client
+
+        client = Client(enforce_csrf_checks=True)
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'reader', 'email': 'reader@example.com'
+        }, content_type='application/json')
+        assert response.status_code == 200
+        assert not response.cookies, 'API не выставляет сессию и CSRF-куку'
+
+    @pytest.mark.django_db
+    def test_api_authenticates_by_jwt(self, catalog):
+        from django.test import Client
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user = catalog.users[0]
+        response = Client().get(
+            '/api/v1/users/me/',
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        assert response.status_code == 200
+        assert response.json()['username'] == user.username
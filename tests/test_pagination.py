@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPagination:
+
+    @pytest.fixture
+    def estimate(self, monkeypatch):
+        from api.v1 import pagination
+
+        def set_estimate(value):
+            monkeypatch.setattr(pagination, 'planner_estimate',
+                                lambda queryset: value)
+            monkeypatch.setattr(pagination.EstimatedCountPagination,
+                                'approximate_threshold', 0)
+
+        return set_estimate
+
+    def test_low_estimate_keeps_next_link(self, catalog, api_client,
+                                          estimate):
+        estimate(2)
+        data = api_client.get('/api/v1/titles/', {'limit': 3}).json()
+        assert data['count_is_approximate'] is True
+        assert len(data['results']) == 3
+        assert data['next'] is not None, (
+            'Следующая страница есть, даже если оценка count меньше'
+        )
+        assert data['count'] == 4
+        data = api_client.get(data['next']).json()
+        assert len(data['results']) == 1
+        assert data['next'] is None
+
+    def test_high_estimate_has_no_extra_pages(self, catalog, api_client,
+                                              estimate):
+        estimate(1000)
+        data = api_client.get('/api/v1/titles/', {'limit': 2,
+                                                  'offset': 2}).json()
+        assert data['count'] == 1000
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+    def test_exact_count(self, catalog, api_client):
+        data = api_client.get('/api/v1/titles/', {'limit': 2}).json()
+        assert data['count'] == 4
+        assert data['count_is_approximate'] is False
+        assert 'offset=2' in data['next']
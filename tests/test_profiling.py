@@ -0,0 +1,69 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    @pytest.fixture
+    def reports_dir(self, settings, tmp_path):
+        settings.PROFILE_REPORTS_DIR = str(tmp_path)
+        return tmp_path
+
+    def client(self, user):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return client
+
+    def test_only_triggered_admin_requests_are_profiled(self, catalog,
+                                                        reports_dir):
+        admin_client = self.client(catalog.admin)
+        response = admin_client.get('/api/v1/titles/')
+        assert 'X-Profile-Id' not in response
+        response = self.client(catalog.users[0]).get(
+            '/api/v1/titles/', {'profile': 1}
+        )
+        assert 'X-Profile-Id' not in response, (
+            'Профилируются только запросы администратора'
+        )
+        assert list(reports_dir.iterdir()) == []
+        response = admin_client.get('/api/v1/titles/',
+                                    HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        report_id = response['X-Profile-Id']
+        assert sorted(path.name for path in reports_dir.iterdir()) == [
+            f'{report_id}.json', f'{report_id}.prof'
+        ]
+
+    def test_report(self, catalog, reports_dir):
+        import json
+
+        response = self.client(catalog.admin).get('/api/v1/titles/', {'profile': 1})
+        report = json.loads(
+            (reports_dir / f"{response['X-Profile-Id']}.json").read_text(
+                encoding='utf-8'
+            )
+        )
+        assert report['status'] == 200
+        assert report['query_count'] == len(report['queries']) > 0
+        assert sum(statement['count']
+                   for statement in report['statements']) == (
+            report['query_count']
+        )
+
+    def test_old_reports_are_removed(self, catalog, reports_dir, settings):
+        settings.PROFILE_REPORTS_LIMIT = 2
+        admin_client = self.client(catalog.admin)
+        report_ids = [
+            admin_client.get('/api/v1/categories/',
+                             {'profile': 1})['X-Profile-Id']
+            for _ in range(4)
+        ]
+        assert sorted(path.name for path in reports_dir.iterdir()) == sorted(
+            f'{report_id}.{extension}' for report_id in report_ids[-2:]
+            for extension in ('json', 'prof')
+        )
@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestValuesReaders:
+
+    @pytest.fixture
+    def catalog(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Category, Comment, Genre, Review, Title
+
+        users = [
+            get_user_model().objects.create(
+                username=f'user{i}', email=f'user{i}@example.com'
+            )
+            for i in range(3)
+        ]
+        category = Category.objects.create(name='Фильм "№1"', slug='movie')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        drama = Genre.objects.create(name='Драма\\новая', slug='drama')
+        rated = Title.objects.create(
+            name='Фильм', year=1999, description='Описание\nв две строки',
+            category=category
+        )
+        rated.genre.set([drama, comedy])
+        Title.objects.create(name='Без всего', year=2020)
+        for user, score in zip(users, (10, 7, 8)):
+            review = Review.objects.create(
+                title=rated, author=user, text='отзыв', score=score
+            )
+            Comment.objects.create(review=review, author=users[0],
+                                   text='комментарий')
+        return rated
+
+    def assert_same(self, reader, queryset, serializer_class):
+        from rest_framework.renderers import JSONRenderer
+
+        expected = serializer_class(queryset, many=True).data
+        actual = reader.read(queryset)
+        renderer = JSONRenderer()
+        assert renderer.render(list(actual.values())) == renderer.render(
+            expected
+        ), f'{serializer_class.__name__} и values() должны совпадать'
+
+    def test_title_reader_matches_read_title_serializer(self, catalog):
+        from api.v1.readers import title_reader
+        from api.v1.serializers import ReadTitleSerializer
+        from api.v1.title_json import TITLE_RATING, ordered_genres
+        from reviews.models import Title
+
+        self.assert_same(
+            title_reader,
+            Title.objects.annotate(rating=TITLE_RATING).select_related(
+                'category'
+            ).prefetch_related(ordered_genres()).order_by('pk'),
+            ReadTitleSerializer
+        )
+
+    def test_review_reader_matches_review_serializer(self, catalog):
+        from api.v1.readers import review_reader
+        from api.v1.serializers import ReviewSerializer
+
+        self.assert_same(review_reader, catalog.reviews.all(),
+                         ReviewSerializer)
+
+    def test_comment_reader_matches_comment_serializer(self, catalog):
+        from api.v1.readers import comment_reader
+        from api.v1.serializers import CommentSerializer
+        from reviews.models import Comment
+
+        self.assert_same(comment_reader, Comment.objects.all(),
+                         CommentSerializer)
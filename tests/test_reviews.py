@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def post(self, client, title_id, score=5):
+        return client.post(f'/api/v1/titles/{title_id}/reviews/',
+                           {'text': 'отзыв', 'score': score}, format='json')
+
+    def test_create_review(self, catalog, admin_client):
+        from reviews.models import Review
+
+        title = catalog.titles[0]
+        response = self.post(admin_client, title.pk)
+        assert response.status_code == 201
+        assert response.json()['author'] == 'admin'
+        assert Review.objects.filter(title=title).count() == 4
+
+    def test_second_review_maps_to_validation_error(
+        self, catalog, admin_client
+    ):
+        from reviews.models import Review
+
+        title = catalog.titles[0]
+        self.post(admin_client, title.pk)
+        response = self.post(admin_client, title.pk, score=1)
+        assert response.status_code == 400, (
+            'Нарушение unique_review должно возвращать 400, а не 500'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Может существовать только один отзыв!']
+        }
+        assert Review.objects.get(
+            title=title, author=catalog.admin
+        ).score == 5
+        # Неудачная вставка не ломает транзакцию запроса.
+        assert self.post(admin_client, catalog.titles[1].pk).status_code == (
+            201
+        )
+
+    def test_review_for_missing_or_hidden_title(self, catalog, admin_client):
+        from reviews.models import Review, Title
+
+        title = catalog.titles[1]
+        Title.objects.filter(pk=title.pk).update(is_hidden=True)
+        assert self.post(admin_client, title.pk).status_code == 404
+        assert self.post(admin_client, 10 ** 6).status_code == 404
+        assert not Review.objects.filter(author=catalog.admin).exists()
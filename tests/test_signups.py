@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestSignups:
+
+    @pytest.fixture
+    def client(self):
+        from rest_framework.test import APIClient
+
+        return APIClient()
+
+    def signup(self, client, username):
+        return client.post('/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@example.com'
+        }, format='json')
+
+    def age(self, days, **filters):
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+
+        get_user_model().objects.filter(**filters).update(
+            date_joined=timezone.now() - timedelta(days=days)
+        )
+
+    def test_token_confirms_signup_and_spends_code(self, client):
+        from django.contrib.auth import get_user_model
+
+        self.signup(client, 'reader')
+        user = get_user_model().objects.get(username='reader')
+        assert user.last_login is None
+        code = user.confirmation_code
+        data = {'username': 'reader', 'confirmation_code': code}
+
+        assert client.post('/api/v1/auth/token/', data,
+                           format='json').status_code == 200
+        user.refresh_from_db()
+        assert user.last_login is not None, (
+            'Выдача токена должна отмечать регистрацию подтверждённой'
+        )
+        assert user.confirmation_code is None
+        assert client.post('/api/v1/auth/token/', data,
+                           format='json').status_code == 400, (
+            'Код подтверждения должен быть одноразовым'
+        )
+
+    def test_repeated_signup_restarts_max_age(self, client):
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+
+        self.signup(client, 'reader')
+        self.age(30, username='reader')
+        self.signup(client, 'reader')
+        user = get_user_model().objects.get(username='reader')
+        assert user.date_joined > timezone.now() - timedelta(days=1), (
+            'Повторный запрос кода должен заново отсчитывать срок регистрации'
+        )
+
+    def test_purge_signups(self, client):
+        from io import StringIO
+
+        from django.contrib.auth import get_user_model
+        from django.core.management import call_command
+        from reviews.models import Review, Title
+
+        User = get_user_model()
+        for i in range(3):
+            self.signup(client, f'bot{i}')
+        self.signup(client, 'author')
+        self.signup(client, 'fresh')
+        self.signup(client, 'reader')
+        code = User.objects.get(username='reader').confirmation_code
+        client.post('/api/v1/auth/token/', {
+            'username': 'reader', 'confirmation_code': code
+        }, format='json')
+        Review.objects.create(
+            title=Title.objects.create(name='Фильм', year=1999),
+            author=User.objects.get(username='author'), text='отзыв', score=5
+        )
+        self.age(30, username__in=('bot0', 'bot1', 'bot2', 'author',
+                                   'reader'))
+        # Код, выданный до подтверждения, но не стёртый.
+        User.objects.filter(username='reader').update(confirmation_code='old')
+
+        out = StringIO()
+        call_command('purge_signups', '--dry-run', stdout=out)
+        assert out.getvalue() == 'users: к удалению 3\n'
+        assert User.objects.count() == 6, '--dry-run ничего не удаляет'
+
+        out = StringIO()
+        call_command('purge_signups', '--chunk-size', '2', stdout=out)
+        assert out.getvalue() == 'users: удалено 3\ncodes: очищено 1\n'
+        assert set(User.objects.values_list('username', flat=True)) == {
+            'author', 'fresh', 'reader'
+        }
+        assert User.objects.get(username='reader').confirmation_code is None
@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestSimilarTitles:
+
+    @pytest.fixture
+    def titles(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Review, Title
+
+        users = [
+            get_user_model().objects.create(
+                username=f'user{i}', email=f'user{i}@example.com'
+            )
+            for i in range(3)
+        ]
+        titles = [Title.objects.create(name=name, year=2000)
+                  for name in ('A', 'B', 'C', 'D')]
+        # A и B оценили одни и те же пользователи, у A и C общий один
+        # из двух, у D с A общих нет.
+        for title, authors in zip(titles, ((0, 1), (0, 1), (0, 2), (2,))):
+            for author in authors:
+                Review.objects.create(title=title, author=users[author],
+                                      text='отзыв', score=10)
+        return titles
+
+    def build(self, *args):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('build_similar_titles', *args, stdout=out)
+        return out.getvalue()
+
+    def similar(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/similar/')
+        assert response.status_code == 200
+        return [(item['name'], round(item['score'], 6))
+                for item in response.json()]
+
+    def test_cosine_scores(self, titles, api_client):
+        self.build()
+        assert self.similar(api_client, titles[0]) == [('B', 1.0),
+                                                       ('C', 0.5)]
+        assert self.similar(api_client, titles[3]) == [('C', 0.707107)]
+
+    def test_top_k(self, titles, api_client):
+        from django.db.models import Count
+        from reviews.models import SimilarTitle
+
+        self.build('--top-k', '1', '--block-size', '2')
+        assert self.similar(api_client, titles[0]) == [('B', 1.0)]
+        assert not SimilarTitle.objects.values('title').annotate(
+            count=Count('pk')
+        ).filter(count__gt=1).exists(), 'Не больше top-k на произведение'
+
+    def test_hidden_titles(self, titles, api_client):
+        from reviews.models import Title
+
+        self.build()
+        Title.objects.filter(pk=titles[1].pk).update(is_hidden=True)
+        assert self.similar(api_client, titles[0]) == [('C', 0.5)], (
+            'Скрытые произведения не отдаются в похожих'
+        )
+        assert api_client.get(
+            f'/api/v1/titles/{titles[1].pk}/similar/'
+        ).status_code == 404
+        assert api_client.get(
+            '/api/v1/titles/1000000/similar/'
+        ).status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestSlowQueries:
+
+    def slow_entries(self, caplog):
+        import json
+
+        return [json.loads(record.getMessage()) for record in caplog.records
+                if record.name == 'api.slow_queries']
+
+    def test_threshold(self, catalog, api_client, settings, caplog):
+        settings.SLOW_QUERY_THRESHOLD_MS = 10 ** 6
+        api_client.get('/api/v1/titles/', {'year_min': 2000})
+        assert self.slow_entries(caplog) == []
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        api_client.get('/api/v1/titles/', {'year_min': 2010})
+        entries = self.slow_entries(caplog)
+        assert entries, 'Запросы не быстрее порога попадают в лог'
+        assert {entry['route'] for entry in entries} == {
+            'GET api/v1/titles/$'
+        }
+        assert not any('2010' in entry['sql'] for entry in entries), (
+            'Литералы в SQL заменены на ?'
+        )
+
+    def test_stats_are_capped(self, settings):
+        from api.slow_queries import INDEX_KEY, record, top_queries
+        from django.core.cache import cache
+
+        settings.SLOW_QUERY_TOP_N = 2
+        for number in range(12):
+            for _ in range(2):
+                record({'fingerprint': f'f{number}', 'sql': f'SELECT {number}',
+                        'route': 'GET /', 'duration_ms': number + 1})
+        assert len(cache.get(INDEX_KEY)) == 8, (
+            'Список отпечатков ограничен SLOW_QUERY_TOP_N * 4'
+        )
+        top = top_queries()
+        assert [item['fingerprint'] for item in top] == ['f11', 'f10']
+        assert top[0]['count'] == 2
+        assert top[0]['total_ms'] == 24
+        assert top[0]['max_ms'] == 12
+
+    def test_explain_sampling(self, catalog, settings):
+        from api.slow_queries import explain
+        from django.db import connection, transaction
+        from reviews.models import Title
+
+        if connection.vendor != 'postgresql':
+            pytest.skip('EXPLAIN пишется только для Postgres')
+        sql = 'SELECT id FROM reviews_title WHERE year > %s'
+        settings.SLOW_QUERY_ANALYZE_RATE = 0
+        plan, analyzed = explain(connection, sql, (2000, ))
+        assert analyzed is False
+        assert 'Actual Total Time' not in plan[0]['Plan']
+        settings.SLOW_QUERY_ANALYZE_RATE = 1
+        plan, analyzed = explain(connection, sql, (2000, ))
+        assert analyzed is True
+        assert 'Actual Total Time' in plan[0]['Plan']
+        with transaction.atomic():
+            plan, _ = explain(connection, 'SELECT * FROM missing', ())
+            assert 'error' in plan
+            assert Title.objects.count() == len(catalog.titles), (
+                'Ошибка EXPLAIN не обрывает транзакцию запроса'
+            )
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTaxonomyCache:
+
+    def version(self):
+        from django.core.cache import cache
+        from reviews.taxonomy import genre_cache
+
+        return cache.get(genre_cache.version_key)
+
+    def test_write_invalidates_after_commit(self):
+        from django.db import transaction
+        from reviews.models import Genre
+        from reviews.taxonomy import genre_cache
+
+        assert genre_cache.all() == ()
+        version = self.version()
+        with transaction.atomic():
+            Genre.objects.create(name='Драма', slug='drama')
+            assert self.version() == version, (
+                'До коммита другие воркеры перечитали бы старые строки '
+                'под новой версией'
+            )
+        assert self.version() != version
+        assert genre_cache.get_by_slug('drama').name == 'Драма'
+
+    def test_rolled_back_write_keeps_version(self):
+        from django.db import transaction
+        from reviews.models import Genre
+        from reviews.taxonomy import genre_cache
+
+        genre_cache.all()
+        version = self.version()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Genre.objects.create(name='Драма', slug='drama')
+                raise RuntimeError
+        assert self.version() == version
+        assert genre_cache.get_by_slug('drama') is None
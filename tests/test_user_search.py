@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestUsernameSearch:
+
+    @pytest.fixture(autouse=True)
+    def people(self, catalog):
+        from django.contrib.auth import get_user_model
+
+        User = get_user_model()
+        for username in ('Anna', 'annette', 'bob', 'Joanna', 'an_x'):
+            User.objects.create(username=username,
+                                email=f'{username}@example.com')
+        User.objects.create(username='annika', email='annika@example.com',
+                            is_hidden=True)
+
+    def autocomplete(self, client, **params):
+        return client.get('/api/v1/users/autocomplete/', params)
+
+    def usernames(self, response):
+        assert response.status_code == 200
+        data = response.json()
+        if isinstance(data, dict):
+            data = data['results']
+        return [user['username'] for user in data]
+
+    def test_prefix_is_case_insensitive(self, admin_client):
+        assert self.usernames(self.autocomplete(admin_client, q='an')) == [
+            'Anna', 'annette', 'an_x'
+        ]
+
+    def test_infix_and_limit(self, admin_client):
+        assert self.usernames(self.autocomplete(
+            admin_client, q='ann', mode='infix'
+        )) == ['Anna', 'annette', 'Joanna']
+        assert self.usernames(self.autocomplete(
+            admin_client, q='ann', mode='infix', limit=2
+        )) == ['Anna', 'annette']
+
+    def test_autocomplete_fields(self, admin_client):
+        assert self.autocomplete(admin_client, q='bob').json() == [
+            {'username': 'bob', 'email': 'bob@example.com', 'role': 'user'}
+        ]
+
+    @pytest.mark.parametrize('params', (
+        {'q': 'an', 'mode': 'infix'},
+        {'q': 'an', 'limit': 10 ** 6},
+        {'q': 'an', 'mode': 'suffix'},
+    ))
+    def test_autocomplete_rejects_params(self, admin_client, params):
+        assert self.autocomplete(admin_client, **params).status_code == 400
+
+    def test_autocomplete_is_admin_only(self, catalog, api_client):
+        assert self.autocomplete(api_client, q='an').status_code == 401
+        api_client.force_authenticate(catalog.users[0])
+        assert self.autocomplete(api_client, q='an').status_code == 403
+
+    def test_users_list_search_defaults_to_icontains(self, admin_client):
+        assert set(self.usernames(admin_client.get(
+            '/api/v1/users/', {'search': 'NN'}
+        ))) == {'Anna', 'annette', 'Joanna'}, (
+            'Без search_mode поиск по части имени, как раньше'
+        )
+
+    def test_users_list_search_modes(self, admin_client):
+        assert self.usernames(admin_client.get(
+            '/api/v1/users/', {'search': 'AN', 'search_mode': 'prefix'}
+        )) == ['Anna', 'annette', 'an_x']
+        assert self.usernames(admin_client.get(
+            '/api/v1/users/', {'search': 'nna', 'search_mode': 'infix'}
+        )) == ['Anna', 'Joanna']
+        assert admin_client.get(
+            '/api/v1/users/', {'search': 'nn', 'search_mode': 'infix'}
+        ).status_code == 400
+        assert admin_client.get(
+            '/api/v1/users/', {'search': 'an', 'search_mode': 'suffix'}
+        ).status_code == 400